@@ -190,6 +190,7 @@ class Config:
     BITCOIN_PROCESSOR_BATCH_SIZE = 20
     TRADING_ANALYZER_UPDATE_INTERVAL_SECONDS = 60
     ANALYZER_PROCESS_INTERVAL_SECONDS = 5
+    TRADING_ANALYZER_ANALYSIS_EVERY_TICKS = 5  # Análise completa a cada N ticks
     
     # === NOVO: Multi-Asset Analytics ===
     MULTI_ASSET_COMPARISON_TIMEFRAMES = ['1h', '24h', '7d', '30d']
@@ -1,6 +1,7 @@
 # config_manager.py - Gerenciador dinâmico de configurações CORRIGIDO
 
 import os
+import copy
 import json
 import sqlite3
 from datetime import datetime
@@ -42,7 +43,7 @@ class DynamicConfigManager:
         except Exception as e:
             logger.error(f"[CONFIG_MGR] Erro na inicialização: {e}")
             # Usar configuração padrão em caso de erro
-            self.current_config = self.default_config.copy()
+            self.current_config = copy.deepcopy(self.default_config)
     
     def setup_database(self):
         """Configura banco de dados para configurações dinâmicas"""
@@ -202,7 +203,7 @@ class DynamicConfigManager:
             
             # Se não há configuração salva, usar padrões
             if not config:
-                config = self.default_config.copy()
+                config = copy.deepcopy(self.default_config)
                 self.save_config(config, reason="Configuração inicial")
             
             self.current_config = config
@@ -213,7 +214,7 @@ class DynamicConfigManager:
         except Exception as e:
             logger.error(f"[CONFIG_MGR] Erro ao carregar configuração: {e}")
             # Em caso de erro, usar configuração padrão
-            self.current_config = self.default_config.copy()
+            self.current_config = copy.deepcopy(self.default_config)
             return self.current_config
     
     def save_config(self, config: Dict[str, Any], changed_by: str = 'system', reason: str = None) -> bool:
@@ -425,15 +426,18 @@ class DynamicConfigManager:
             # Carregar regras de validação do banco
             validation_rules = self._load_validation_rules()
             
+            # Apenas as chaves que possuem regras, na ordem da configuração
             for key, value in flat_config.items():
-                if key in validation_rules:
-                    for rule in validation_rules[key]:
-                        result = self._apply_validation_rule(key, value, rule)
-                        if not result['valid']:
-                            if result['severity'] == 'error':
-                                errors.append(result['message'])
-                            else:
-                                warnings.append(result['message'])
+                rules = validation_rules.get(key)
+                if not rules:
+                    continue
+                for rule in rules:
+                    result = self._apply_validation_rule(key, value, rule)
+                    if not result['valid']:
+                        if result['severity'] == 'error':
+                            errors.append(result['message'])
+                        else:
+                            warnings.append(result['message'])
             
             # Validações específicas adicionais
             additional_errors = self._additional_validations(flat_config)
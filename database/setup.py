@@ -5,6 +5,13 @@ import os
 from utils.logging_config import logger
 from config import app_config
 
+def _enable_wal(cursor: sqlite3.Cursor):
+    """
+    Coloca o banco em modo WAL. O journal_mode WAL é persistente no arquivo,
+    então toda conexão aberta depois (streamers, rotas, analytics) já o herda.
+    """
+    cursor.execute('PRAGMA journal_mode=WAL')
+
 def setup_bitcoin_stream_db(db_path: str):
     """
     Sets up the database schema for Bitcoin streaming data.
@@ -20,6 +27,8 @@ def setup_bitcoin_stream_db(db_path: str):
     cursor = conn.cursor()
     
     try:
+        _enable_wal(cursor)
+        
         # Create bitcoin_stream table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS bitcoin_stream (
@@ -86,6 +95,8 @@ def setup_trading_analyzer_db(db_path: str):
     cursor = conn.cursor()
     
     try:
+        _enable_wal(cursor)
+        
         # Create price_history table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS price_history (
@@ -124,6 +135,10 @@ def setup_trading_analyzer_db(db_path: str):
             )
         ''')
         
+        # Índices das consultas de carga (últimos preços e sinais ativos recentes)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_price_history_timestamp ON price_history(timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_signals_status_created ON trading_signals(status, created_at)')
+        
         conn.commit()
         logger.info(f"[DB_SETUP] Banco de dados Trading Analyzer em '{db_path}' inicializado/verificado.")
         
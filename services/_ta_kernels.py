@@ -0,0 +1,231 @@
+# services/_ta_kernels.py
+# Kernels numéricos dos indicadores técnicos (compilados com Numba quando disponível)
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Fallback no-op quando numba não está instalado"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit('float64(float64[:], int64)', cache=True)
+def _mean_tail(arr, n):
+    """Média dos últimos n elementos"""
+    total = 0.0
+    start = arr.shape[0] - n
+    for i in range(start, arr.shape[0]):
+        total += arr[i]
+    return total / n
+
+
+@njit('float64(float64[:], int64)', cache=True)
+def sma(arr, period):
+    """Simple Moving Average"""
+    n = arr.shape[0]
+    if n < period:
+        return _mean_tail(arr, n)
+    return _mean_tail(arr, period)
+
+
+@njit('float64(float64[:], int64)', cache=True)
+def ewm_last(arr, period):
+    """Último valor da recursão EMA iniciada no primeiro elemento"""
+    alpha = 2.0 / (period + 1.0)
+    value = arr[0]
+    for i in range(1, arr.shape[0]):
+        value = alpha * arr[i] + (1.0 - alpha) * value
+    return value
+
+
+@njit('float64(float64[:], int64)', cache=True)
+def ema(arr, period):
+    """Exponential Moving Average (recursão a partir do primeiro elemento)"""
+    n = arr.shape[0]
+    if n < period:
+        return _mean_tail(arr, n)
+    return ewm_last(arr, period)
+
+
+@njit('float64(float64[:], int64)', cache=True)
+def rsi(arr, period):
+    """Relative Strength Index (médias simples dos últimos ganhos/perdas)"""
+    n = arr.shape[0]
+    if n < period + 1:
+        return 50.0
+
+    gain_sum = 0.0
+    loss_sum = 0.0
+    for i in range(n - period, n):
+        delta = arr[i] - arr[i - 1]
+        if delta > 0:
+            gain_sum += delta
+        elif delta < 0:
+            loss_sum -= delta
+
+    avg_gain = gain_sum / period
+    avg_loss = loss_sum / period
+    if avg_loss == 0:
+        return 100.0
+
+    rs = avg_gain / avg_loss
+    return 100.0 - (100.0 / (1.0 + rs))
+
+
+@njit('UniTuple(float64, 3)(float64[:])', cache=True)
+def macd(arr):
+    """MACD simplificado: (linha, sinal, histograma)"""
+    if arr.shape[0] < 26:
+        return 0.0, 0.0, 0.0
+
+    macd_line = ema(arr, 12) - ema(arr, 26)
+    signal_line = macd_line * 0.9
+    return macd_line, signal_line, macd_line - signal_line
+
+
+@njit('UniTuple(float64, 3)(float64[:], int64, float64)', cache=True)
+def bbands(arr, period, std_dev):
+    """Bollinger Bands: (upper, middle, lower)"""
+    n = arr.shape[0]
+    if n < period:
+        price = arr[n - 1]
+        return price, price, price
+
+    middle = _mean_tail(arr, period)
+    var = 0.0
+    for i in range(n - period, n):
+        diff = arr[i] - middle
+        var += diff * diff
+    std = np.sqrt(var / period)
+
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+@njit('UniTuple(float64, 2)(float64[:], int64)', cache=True)
+def stoch(arr, period):
+    """Stochastic Oscillator: (%K, %D)"""
+    n = arr.shape[0]
+    if n < period:
+        return 50.0, 50.0
+
+    lowest = arr[n - period]
+    highest = lowest
+    for i in range(n - period + 1, n):
+        value = arr[i]
+        if value < lowest:
+            lowest = value
+        elif value > highest:
+            highest = value
+
+    if highest == lowest:
+        return 50.0, 50.0
+
+    k = ((arr[n - 1] - lowest) / (highest - lowest)) * 100.0
+    return k, k
+
+
+@njit('float64(float64[:])', cache=True)
+def trend_strength(arr):
+    """Força da tendência (0-1) a partir dos movimentos up/down dos últimos 20 preços"""
+    n = arr.shape[0]
+    if n < 20:
+        return 0.5
+
+    up_sum = 0.0
+    down_sum = 0.0
+    for i in range(n - 19, n):
+        move = arr[i] - arr[i - 1]
+        if move > 0:
+            up_sum += move
+        else:
+            down_sum -= move
+
+    if up_sum + down_sum == 0:
+        return 0.5
+
+    adx = abs(up_sum - down_sum) / (up_sum + down_sum)
+    return min(adx, 1.0)
+
+
+@njit('UniTuple(float64, 2)(float64[:])', cache=True)
+def support_resistance(arr):
+    """Suporte/resistência por pivot dos últimos 20 preços"""
+    n = arr.shape[0]
+    if n < 20:
+        return arr[n - 1] * 0.98, arr[n - 1] * 1.02
+
+    low = arr[n - 20]
+    high = low
+    for i in range(n - 19, n):
+        value = arr[i]
+        if value < low:
+            low = value
+        elif value > high:
+            high = value
+
+    pivot = (high + low + arr[n - 1]) / 3
+    return pivot - (high - low) * 0.382, pivot + (high - low) * 0.382
+
+
+@njit('float64(float64[:], int64)', cache=True)
+def atr(arr, period):
+    """ATR simplificado: média das variações absolutas"""
+    n = arr.shape[0]
+    if n < 2:
+        return arr[n - 1] * 0.02
+
+    count = min(n - 1, period)
+    total = 0.0
+    for i in range(n - count, n):
+        total += abs(arr[i] - arr[i - 1])
+    return total / count
+
+
+@njit('UniTuple(float64, 4)(float64[:], int64)', cache=True)
+def window_indicators(arr, atr_period):
+    """Indicadores de janela num único dispatch: (suporte, resistência, tendência, ATR)"""
+    support, resistance = support_resistance(arr)
+    return support, resistance, trend_strength(arr), atr(arr, atr_period)
+
+
+
+@njit('UniTuple(float64, 14)(float64[:], float64[:], int64)', cache=True)
+def all_indicators(prices, volumes, rsi_period):
+    """Indicadores do analyzer de produção num único dispatch sobre a janela:
+    (sma_9, sma_21, sma_50, ema_12, ema_26, rsi, bb_upper, bb_middle, bb_lower,
+     stoch_k, volume_sma, suporte, resistência, tendência)"""
+    n = prices.shape[0]
+    sma_50 = sma(prices, 50) if n >= 50 else prices[n - 1]
+    bb_upper, bb_middle, bb_lower = bbands(prices, 20, 2.0)
+    stoch_k, _ = stoch(prices, 14)
+    support, resistance = support_resistance(prices)
+    return (sma(prices, 9), sma(prices, 21), sma_50, ema(prices, 12), ema(prices, 26),
+            rsi(prices, rsi_period), bb_upper, bb_middle, bb_lower, stoch_k,
+            sma(volumes, 20), support, resistance, trend_strength(prices))
+
+
+if NUMBA_AVAILABLE:
+    # O primeiro dispatch inicializa o runtime do numba (~15 ms); pagar isso no import, não no primeiro tick
+    window_indicators(np.ones(20), 14)
+else:
+    # Sem numba os loops acima rodam no interpretador; usar ufuncs NumPy onde compensa
+
+    def trend_strength(arr):
+        """Força da tendência (0-1) — versão vetorizada para execução sem numba"""
+        if arr.shape[0] < 20:
+            return 0.5
+
+        diffs = np.diff(arr[-20:])
+        up_sum = float(np.maximum(diffs, 0.0).sum())
+        down_sum = float(np.maximum(-diffs, 0.0).sum())
+        if up_sum + down_sum == 0:
+            return 0.5
+
+        return min(abs(up_sum - down_sum) / (up_sum + down_sum), 1.0)
@@ -1,7 +1,9 @@
 # services/advanced_pattern_analyzer.py
 
+import sys
 import numpy as np
 import sqlite3
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
@@ -1002,7 +1004,7 @@ class AdvancedPatternAnalyzer:
                     'id': row[0],
                     'timestamp': row[1],
                     'pattern_type': row[2],
-                    'method': row[3],
+                    'method': sys.intern(row[3]) if row[3] else row[3],  # Comparações por identidade
                     'entry_price': row[4],
                     'stop_loss': row[5],
                     'targets': eval(row[6]) if row[6] else [],  # Convert string back to list
@@ -1123,15 +1125,17 @@ class AdvancedPatternAnalyzer:
     def get_comprehensive_analysis(self) -> Dict:
         """Retorna análise completa dos padrões avançados"""
         try:
+            method_counts = Counter(p.method for p in self.patterns_detected)
+            
             return {
                 'timestamp': datetime.now().isoformat(),
                 'active_patterns': self.get_active_patterns(),
                 'method_performance': self.get_method_performance_report(),
                 'pattern_summary': {
-                    'elliott_waves_detected': len([p for p in self.patterns_detected if p.method == 'ELLIOTT_WAVE']),
-                    'double_bottoms_detected': len([p for p in self.patterns_detected if p.method == 'DOUBLE_BOTTOM']),
-                    'oco_signals': len([p for p in self.patterns_detected if p.method == 'OCO']),
-                    'ocoi_signals': len([p for p in self.patterns_detected if p.method == 'OCOI']),
+                    'elliott_waves_detected': method_counts['ELLIOTT_WAVE'],
+                    'double_bottoms_detected': method_counts['DOUBLE_BOTTOM'],
+                    'oco_signals': method_counts['OCO'],
+                    'ocoi_signals': method_counts['OCOI'],
                     'total_patterns': len(self.patterns_detected)
                 },
                 'validation_config': self.validation_config,
@@ -1,25 +1,55 @@
 # your_project/services/generic_asset_streamer.py - ARQUIVO NOVO
 
+import heapq
+import itertools
+import json
 import time
 import threading
+import numpy as np
 import requests
-from collections import deque
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
 from utils.logging_config import logger
 from config import app_config
 from models.bitcoin_data import BitcoinData  # Reutilizar modelo existente
 
+try:
+    import orjson
+    _json_loads = orjson.loads  # parser em C; aceita bytes direto de response.content
+except ImportError:
+    _json_loads = json.loads
+
+def _next_deadline(deadline: float, interval: float) -> float:
+    """Próximo instante da grade start + k*interval (relógio monotônico) ainda no futuro"""
+    deadline += interval
+    now = time.monotonic()
+    if deadline <= now:
+        # Ciclo atrasou mais que um intervalo: pular os ticks perdidos em vez de disparar em rajada
+        deadline += ((now - deadline) // interval + 1) * interval
+    return deadline
+
+
 class GenericAssetStreamer:
     """
     Generic asset data streamer que pode ser usado para qualquer cryptocurrency.
     Baseado no BitcoinDataStreamer existente, mas genérico e reutilizável.
     """
     
+    # Sessão HTTP compartilhada por todos os streamers (conexões keep-alive com a Binance)
+    _http: Optional[requests.Session] = None
+    _http_lock = threading.Lock()
+    
+    # Tolerância para jitter do scheduler ao checar o intervalo mínimo entre fetches
+    _FETCH_SLACK = 0.5
+    
     def __init__(self, 
                  asset_symbol: str,
                  max_queue_size: int = None,
-                 fetch_interval: int = None):
+                 fetch_interval: int = None,
+                 batch_fetcher: Optional['MultiAssetBatchFetcher'] = None,
+                 scheduler: Optional['StreamerScheduler'] = None):
         """
         Inicializa o GenericAssetStreamer.
 
@@ -27,6 +57,9 @@ class GenericAssetStreamer:
             asset_symbol (str): Símbolo do asset (BTC, ETH, SOL)
             max_queue_size (int): Tamanho máximo da queue em memória
             fetch_interval (int): Intervalo entre fetches em segundos
+            batch_fetcher (MultiAssetBatchFetcher): Fetcher compartilhado; se informado,
+                o streamer não faz I/O próprio e recebe os tickers via _ingest()
+            scheduler (StreamerScheduler): Scheduler dos polls individuais (default: compartilhado do módulo)
         """
         self.asset_symbol = asset_symbol.upper()
         self.asset_config = app_config.get_asset_config(self.asset_symbol)
@@ -36,6 +69,12 @@ class GenericAssetStreamer:
         self.min_price = self.asset_config['min_price']
         self.max_price = self.asset_config['max_price']
         self.precision = self.asset_config['precision']
+        # Invariantes por streamer usados a cada tick
+        self._source = f'binance_{self.asset_symbol.lower()}'
+        # Preços guardados como int64 em ticks de 10^-precision (comparação de duplicado/range exata)
+        self._scale = 10 ** self.precision
+        self._min_ticks = round(self.min_price * self._scale)
+        self._max_ticks = round(self.max_price * self._scale)
         
         # Configurações de streaming
         self.max_queue_size = max_queue_size or app_config.MULTI_ASSET_MAX_QUEUE_SIZE
@@ -43,35 +82,98 @@ class GenericAssetStreamer:
         
         # Estado do streamer
         self.is_running = False
-        self.data_queue = deque(maxlen=self.max_queue_size)
-        self.subscribers = []
-        self.last_fetch_time = 0
+        # Ring buffer SoA dos ticks aceitos (uma coluna NumPy por campo; market_cap/source são constantes)
+        self._ts = np.empty(self.max_queue_size, dtype='datetime64[us]')
+        self._price_ticks = np.empty(self.max_queue_size, dtype=np.int64)
+        self._volumes = np.empty(self.max_queue_size, dtype=np.float64)
+        self._changes = np.empty(self.max_queue_size, dtype=np.float64)
+        self._n = 0
+        self._head = 0
+        self._last_tick_mono = 0.0  # monotonic do último tick aceito (janela de duplicados)
+        # Copy-on-write: escritores publicam uma nova tupla sob o lock; o notify só lê a referência.
+        # O dict (ordenado por inserção) dá membership O(1) para add/remove
+        self._subscriber_set: Dict[Callable, None] = {}
+        self.subscribers = ()
+        self._subscribers_lock = threading.Lock()
+        self.last_fetch_time = 0  # wall clock, só para estatísticas
+        self._last_fetch_mono = None  # relógio monotônico do início do último fetch
         self.api_errors = 0
         self.max_consecutive_errors = app_config.BITCOIN_STREAM_MAX_CONSECUTIVE_ERRORS
         self.last_successful_price = None
-        self._stream_thread = None
+        self._last_price_ticks = None
+        self._validate_price = self._make_price_validator()
+        self.batch_fetcher = batch_fetcher
+        self.scheduler = scheduler or _default_scheduler
+        self._consecutive_failures = 0
+        
+        # Campos fixos de get_stream_statistics (os dinâmicos são preenchidos a cada chamada)
+        self._stats_static = {
+            'asset_symbol': self.asset_symbol,
+            'binance_symbol': self.binance_symbol,
+            'is_running': None,
+            'total_data_points': None,
+            'api_errors': None,
+            'last_fetch_time': None,
+            'last_fetch_time_iso': None,
+            'last_price': None,
+            'queue_size': None,
+            'subscribers_count': None,
+            'source': self._source,
+            'fetch_interval_minutes': self.fetch_interval / 60,
+            'asset_config': self.asset_config
+        }
+        self._last_fetch_iso = (None, None)
         
         logger.info(f"[{self.asset_symbol}] Generic streamer inicializado: {self.binance_symbol}")
 
     def add_subscriber(self, callback: Callable):
         """Registra callback para notificações de novos dados"""
-        if callback not in self.subscribers:
-            self.subscribers.append(callback)
-            logger.info(f"[{self.asset_symbol}] Subscriber adicionado. Total: {len(self.subscribers)}")
+        with self._subscribers_lock:
+            if callback in self._subscriber_set:
+                return
+            self._subscriber_set[callback] = None
+            self.subscribers = tuple(self._subscriber_set)
+        logger.info(f"[{self.asset_symbol}] Subscriber adicionado. Total: {len(self.subscribers)}")
         
     def remove_subscriber(self, callback: Callable):
         """Remove callback da lista de subscribers"""
-        if callback in self.subscribers:
-            self.subscribers.remove(callback)
-            logger.info(f"[{self.asset_symbol}] Subscriber removido. Total: {len(self.subscribers)}")
+        with self._subscribers_lock:
+            if callback not in self._subscriber_set:
+                return
+            del self._subscriber_set[callback]
+            self.subscribers = tuple(self._subscriber_set)
+        logger.info(f"[{self.asset_symbol}] Subscriber removido. Total: {len(self.subscribers)}")
+    
+    @classmethod
+    def _get_http_session(cls) -> requests.Session:
+        """Retorna a sessão HTTP compartilhada, criando-a no primeiro uso"""
+        if cls._http is None:
+            with cls._http_lock:
+                if cls._http is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=Retry(total=0))
+                    session.mount('https://', adapter)
+                    cls._http = session
+        return cls._http
+    
+    @classmethod
+    def close_http_session(cls):
+        """Fecha a sessão HTTP compartilhada (shutdown)"""
+        with cls._http_lock:
+            if cls._http is not None:
+                cls._http.close()
+                cls._http = None
     
     def _can_fetch_from_api(self) -> bool:
         """Verifica se pode fazer fetch da API baseado no intervalo"""
-        time_since_last = time.time() - self.last_fetch_time
-        return time_since_last >= self.fetch_interval
+        if self._last_fetch_mono is None:
+            return True
+        time_since_last = time.monotonic() - self._last_fetch_mono
+        return time_since_last >= self.fetch_interval - self._FETCH_SLACK
     
-    def _mark_api_fetch(self):
-        """Marca timestamp do último fetch bem-sucedido"""
+    def _mark_api_fetch(self, started: Optional[float] = None):
+        """Marca timestamp do último fetch bem-sucedido (started: monotonic do início do request)"""
+        self._last_fetch_mono = started if started is not None else time.monotonic()
         self.last_fetch_time = time.time()
     
     def _handle_api_error(self, error: str):
@@ -88,10 +190,11 @@ class GenericAssetStreamer:
             logger.info(f"[{self.asset_symbol}] API recuperada - resetando contador de erros.")
         self.api_errors = 0
         
-    def _fetch_binance_data(self) -> Optional[BitcoinData]:
+    def _fetch_binance_data(self) -> Optional[Dict]:
         """
-        Faz fetch dos dados do asset da API Binance.
-        Retorna BitcoinData (reutilizando modelo existente) ou None se erro.
+        Faz fetch do ticker 24hr do asset na API Binance.
+        Retorna o ticker bruto (dict) ou None se erro; o BitcoinData só é
+        construído em _process_ticker, depois da validação.
         """
         if not self._can_fetch_from_api():
             logger.debug(f"[{self.asset_symbol}] Aguardando intervalo de fetch ({self.fetch_interval}s).")
@@ -105,24 +208,15 @@ class GenericAssetStreamer:
             url = app_config.BINANCE_API_URL
             params = {'symbol': self.binance_symbol}
             
-            response = requests.get(url, params=params, timeout=10)
+            started = time.monotonic()
+            response = self._get_http_session().get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = _json_loads(response.content)
             
-            self._mark_api_fetch()
+            self._mark_api_fetch(started)
             self._reset_api_errors()
             
-            # Criar BitcoinData (nome genérico mas funciona para qualquer asset)
-            asset_data = BitcoinData(
-                timestamp=datetime.now(),
-                price=float(data['lastPrice']),
-                volume_24h=float(data['volume']) * float(data['lastPrice']),
-                market_cap=0,  # Binance API não fornece market cap diretamente
-                price_change_24h=float(data['priceChangePercent']),
-                source=f'binance_{self.asset_symbol.lower()}'
-            )
-            
-            return asset_data
+            return data
             
         except requests.exceptions.RequestException as e:
             self._handle_api_error(f"Erro de requisição: {e}")
@@ -130,46 +224,129 @@ class GenericAssetStreamer:
         except ValueError as e:
             self._handle_api_error(f"Erro de conversão de dados: {e}")
             return None
-        except KeyError as e:
-            self._handle_api_error(f"Chave ausente na resposta: {e}")
-            return None
         except Exception as e:
             self._handle_api_error(f"Erro inesperado: {e}")
             return None
     
-    def _validate_price_data(self, data: BitcoinData) -> bool:
-        """Valida dados de preço para sanity checks"""
-        if not data or data.price <= 0:
-            logger.warning(f"[{self.asset_symbol}] Preço rejeitado - inválido: {data.price:.2f}")
-            return False
-        
-        # Verificar range específico do asset
-        if not (self.min_price <= data.price <= self.max_price):
-            logger.warning(f"[{self.asset_symbol}] Preço fora da faixa esperada: ${data.price:.2f} (Esperado: ${self.min_price:.0f}-${self.max_price:.0f})")
-            return False
+    def _build_asset_data(self, data: Dict, price: float, timestamp: datetime) -> BitcoinData:
+        """Converte um ticker 24hr da Binance (já validado) em BitcoinData"""
+        # Criar BitcoinData (nome genérico mas funciona para qualquer asset)
+        return BitcoinData(
+            timestamp=timestamp,
+            price=price,
+            volume_24h=float(data['volume']) * price,
+            market_cap=0,  # Binance API não fornece market cap diretamente
+            price_change_24h=float(data['priceChangePercent']),
+            source=self._source
+        )
+    
+    def _make_price_validator(self) -> Callable[[int, Optional[int]], bool]:
+        """Monta o validador do preço bruto (em ticks) com os limites do asset fixados no closure"""
+        min_ticks, max_ticks = self._min_ticks, self._max_ticks
+        threshold = app_config.PRICE_CHANGE_THRESHOLD_PCT
         
-        # Verificar variação extrema se temos preço anterior
-        if self.last_successful_price:
-            price_change_pct = abs(data.price - self.last_successful_price) / self.last_successful_price
-            if price_change_pct > app_config.PRICE_CHANGE_THRESHOLD_PCT:
-                logger.warning(f"[{self.asset_symbol}] Variação muito grande: ${self.last_successful_price:.2f} -> ${data.price:.2f} (>{app_config.PRICE_CHANGE_THRESHOLD_PCT*100:.0f}%)")
+        def validate(price_ticks: int, last_ticks: Optional[int]) -> bool:
+            if price_ticks <= 0 or not (min_ticks <= price_ticks <= max_ticks):
+                return False
+            if last_ticks and abs(price_ticks - last_ticks) > threshold * last_ticks:
                 return False
+            return True
         
-        return True
+        return validate
     
-    def _is_duplicate_data(self, new_data: BitcoinData) -> bool:
-        """Verifica se os dados são duplicados"""
-        if not self.data_queue:
+    def _log_rejected_price(self, price_ticks: int):
+        """Loga o motivo da rejeição (caminho lento; só roda quando o validador recusa)"""
+        price = price_ticks / self._scale
+        if price_ticks <= 0:
+            logger.warning(f"[{self.asset_symbol}] Preço rejeitado - inválido: {price:.2f}")
+        elif not (self._min_ticks <= price_ticks <= self._max_ticks):
+            logger.warning(f"[{self.asset_symbol}] Preço fora da faixa esperada: ${price:.2f} (Esperado: ${self.min_price:.0f}-${self.max_price:.0f})")
+        else:
+            logger.warning(f"[{self.asset_symbol}] Variação muito grande: ${self.last_successful_price:.2f} -> ${price:.2f} (>{app_config.PRICE_CHANGE_THRESHOLD_PCT*100:.0f}%)")
+    
+    def _is_duplicate_price(self, price_ticks: int, now: float) -> bool:
+        """Verifica se o preço (ticks) repete o último tick aceito há menos de 60s (now: monotonic)"""
+        if not self._n or price_ticks != self._price_ticks[self._head - 1]:
+            return False
+        return now - self._last_tick_mono < 60
+    
+    def _process_ticker(self, row: Dict) -> Optional[bool]:
+        """
+        Valida, descarta duplicados, enfileira e notifica subscribers.
+        Retorna True se aceito, False se inválido e None se duplicado (ignorado, sem contar como falha)
+        """
+        try:
+            price_ticks = round(float(row['lastPrice']) * self._scale)
+            if not self._validate_price(price_ticks, self._last_price_ticks):
+                self._log_rejected_price(price_ticks)
+                return False
+            
+            now = time.monotonic()
+            if self._is_duplicate_price(price_ticks, now):
+                logger.debug(f"[{self.asset_symbol}] Dados duplicados ignorados: ${price_ticks / self._scale:.{self.precision}f}")
+                return None
+            
+            data = self._build_asset_data(row, price_ticks / self._scale, datetime.now())
+        except ValueError as e:
+            self._handle_api_error(f"Erro de conversão de dados: {e}")
             return False
+        except KeyError as e:
+            self._handle_api_error(f"Chave ausente na resposta: {e}")
+            return False
+        
+        self._push_tick(data, price_ticks)
+        self._last_tick_mono = now
+        self.last_successful_price = data.price
+        self._last_price_ticks = price_ticks
         
-        last_data = self.data_queue[-1]
-        time_diff = (new_data.timestamp - last_data.timestamp).total_seconds()
-        same_price = abs(new_data.price - last_data.price) < (0.01 * (10 ** (2 - self.precision)))
+        # Notificar subscribers (snapshot imutável; falhas removidas depois do loop)
+        failed = None
+        for callback in self.subscribers:
+            try:
+                callback(data)
+            except Exception as e:
+                logger.error(f"[{self.asset_symbol}] Erro no subscriber '{getattr(callback, '__name__', callback)}': {e}")
+                if failed is None:
+                    failed = []
+                failed.append(callback)
+        if failed:
+            for callback in failed:
+                self.remove_subscriber(callback)
         
-        return same_price and time_diff < 60
+        logger.info(f"[{self.asset_symbol}] Dados coletados: ${data.price:.{self.precision}f} - Change: {data.price_change_24h:.2f}%")
+        return True
+    
+    def _push_tick(self, data: BitcoinData, price_ticks: int):
+        """Grava o tick na posição atual do ring buffer"""
+        head = self._head
+        self._ts[head] = data.timestamp
+        self._price_ticks[head] = price_ticks
+        self._volumes[head] = data.volume_24h
+        self._changes[head] = data.price_change_24h
+        self._head = (head + 1) % self.max_queue_size
+        if self._n < self.max_queue_size:
+            self._n += 1
+    
+    def _window(self, buffer: np.ndarray, limit: int = 0) -> np.ndarray:
+        """Últimos `limit` valores do buffer em ordem cronológica (todos se limit <= 0)"""
+        head = self._head
+        count = self._n if limit <= 0 else min(limit, self._n)
+        if count <= head:
+            return buffer[head - count:head]
+        return np.concatenate((buffer[head - count:], buffer[:head]))
+    
+    def _ingest(self, row: Dict, started: Optional[float] = None) -> Optional[bool]:
+        """Processa um ticker já baixado pelo MultiAssetBatchFetcher (mesmo retorno de _process_ticker)"""
+        self._mark_api_fetch(started)
+        self._reset_api_errors()
+        
+        accepted = self._process_ticker(row)
+        if accepted is False:
+            logger.warning(f"[{self.asset_symbol}] Falha ao validar dados do batch.")
+        return accepted
     
     def start_streaming(self):
-        """Inicia o processo de streaming em thread separada"""
+        """Inicia o streaming (registrando no batch fetcher ou no scheduler compartilhado)"""
         if self.is_running:
             logger.warning(f"[{self.asset_symbol}] Streaming já está em execução.")
             return
@@ -177,52 +354,43 @@ class GenericAssetStreamer:
         self.is_running = True
         logger.info(f"[{self.asset_symbol}] Iniciando Asset Data Streaming...")
         
-        def stream_worker():
-            """Worker function para thread de streaming"""
-            consecutive_failures = 0
-            max_failures_before_pause = 10
+        if self.batch_fetcher is not None:
+            # Fetch em lote: o thread do fetcher busca e entrega os dados via _ingest()
+            self.batch_fetcher.register(self)
+            return
+        
+        # Sem batch: um thread compartilhado agenda os polls de todos os streamers
+        self._consecutive_failures = 0
+        self.scheduler.register(self)
+    
+    def _poll_once(self, deadline: float) -> float:
+        """Executa um ciclo de fetch (chamado pelo StreamerScheduler). Retorna o próximo deadline"""
+        max_failures_before_pause = 10
+        try:
+            row = self._fetch_binance_data()
+            accepted = self._process_ticker(row) if row else False
             
-            while self.is_running:
-                try:
-                    data = self._fetch_binance_data()
-                    
-                    if data and self._validate_price_data(data) and not self._is_duplicate_data(data):
-                        self.data_queue.append(data)
-                        self.last_successful_price = data.price
-                        
-                        # Notificar subscribers
-                        for callback in self.subscribers[:]:
-                            try:
-                                callback(data)
-                            except Exception as e:
-                                logger.error(f"[{self.asset_symbol}] Erro no subscriber '{callback.__name__}': {e}")
-                                self.remove_subscriber(callback)
-                        
-                        consecutive_failures = 0
-                        logger.info(f"[{self.asset_symbol}] Dados coletados: ${data.price:.{self.precision}f} - Change: {data.price_change_24h:.2f}%")
-                        
-                    elif data and self._is_duplicate_data(data):
-                        logger.debug(f"[{self.asset_symbol}] Dados duplicados ignorados: ${data.price:.{self.precision}f}")
-                    
-                    else:
-                        consecutive_failures += 1
-                        logger.warning(f"[{self.asset_symbol}] Falha ao coletar/validar dados. Falhas consecutivas: {consecutive_failures}")
-                        if consecutive_failures >= max_failures_before_pause:
-                            logger.error(f"[{self.asset_symbol}] Muitas falhas consecutivas. Pausando por 5 minutos...")
-                            time.sleep(300)
-                            consecutive_failures = 0
-                    
-                    time.sleep(self.fetch_interval)
-                    
-                except Exception as e:
-                    consecutive_failures += 1
-                    logger.critical(f"[{self.asset_symbol}] Erro crítico no thread: {e}")
-                    time.sleep(60)
+            if accepted:
+                self._consecutive_failures = 0
             
-            logger.info(f"[{self.asset_symbol}] Asset Data Streaming finalizado.")
-        
-        self._stream_thread = threading.Thread(target=stream_worker, daemon=True)
-        self._stream_thread.start()
+            elif accepted is None:
+                pass  # Duplicado: não é sucesso nem falha, contador inalterado
+            
+            else:
+                self._consecutive_failures += 1
+                logger.warning(f"[{self.asset_symbol}] Falha ao coletar/validar dados. Falhas consecutivas: {self._consecutive_failures}")
+                if self._consecutive_failures >= max_failures_before_pause:
+                    logger.error(f"[{self.asset_symbol}] Muitas falhas consecutivas. Pausando por 5 minutos...")
+                    self._consecutive_failures = 0
+                    return time.monotonic() + 300
+            
+            # Cadência fixa: próximo ponto da grade, descontando o tempo do ciclo
+            return _next_deadline(deadline, self.fetch_interval)
+            
+        except Exception as e:
+            self._consecutive_failures += 1
+            logger.critical(f"[{self.asset_symbol}] Erro crítico no poll: {e}")
+            return time.monotonic() + 60
         
     def stop_streaming(self):
         """Para o processo de streaming"""
@@ -233,35 +401,224 @@ class GenericAssetStreamer:
         self.is_running = False
         logger.info(f"[{self.asset_symbol}] Parando Asset Data Streaming...")
         
-        if self._stream_thread and self._stream_thread.is_alive():
-            self._stream_thread.join(timeout=self.fetch_interval + 5)
-            if self._stream_thread.is_alive():
-                logger.warning(f"[{self.asset_symbol}] Thread não terminou graciosamente.")
+        if self.batch_fetcher is not None:
+            self.batch_fetcher.unregister(self)
+        else:
+            self.scheduler.unregister(self)
         
     def get_recent_data(self, limit: int = 100) -> List[BitcoinData]:
-        """Retorna dados recentes da queue em memória"""
-        return list(self.data_queue)[-limit:]
+        """Retorna dados recentes do ring buffer em memória (BitcoinData montado na leitura)"""
+        source = self._source
+        return [
+            BitcoinData(timestamp=ts, price=price, volume_24h=volume, market_cap=0,
+                        price_change_24h=change, source=source)
+            for ts, price, volume, change in zip(
+                self._window(self._ts, limit).tolist(),
+                (self._window(self._price_ticks, limit) / self._scale).tolist(),
+                self._window(self._volumes, limit).tolist(),
+                self._window(self._changes, limit).tolist()
+            )
+        ]
+    
+    def get_recent_prices(self, limit: int = 100) -> np.ndarray:
+        """Retorna os últimos preços como array NumPy (sem montar objetos)"""
+        return self._window(self._price_ticks, limit) / self._scale
     
     def get_stream_statistics(self) -> Dict:
         """Retorna estatísticas atuais do streamer"""
-        return {
-            'asset_symbol': self.asset_symbol,
-            'binance_symbol': self.binance_symbol,
-            'is_running': self.is_running,
-            'total_data_points': len(self.data_queue),
-            'api_errors': self.api_errors,
-            'last_fetch_time': self.last_fetch_time,
-            'last_fetch_time_iso': datetime.fromtimestamp(self.last_fetch_time).isoformat() if self.last_fetch_time > 0 else None,
-            'last_price': self.last_successful_price,
-            'queue_size': len(self.data_queue),
-            'subscribers_count': len(self.subscribers),
-            'source': f'binance_{self.asset_symbol.lower()}',
-            'fetch_interval_minutes': self.fetch_interval / 60,
-            'asset_config': self.asset_config
-        }
+        # isoformat() só é refeito quando last_fetch_time muda
+        last_fetch_time = self.last_fetch_time
+        if self._last_fetch_iso[0] != last_fetch_time:
+            iso = datetime.fromtimestamp(last_fetch_time).isoformat() if last_fetch_time > 0 else None
+            self._last_fetch_iso = (last_fetch_time, iso)
+        
+        # Cópia do template (mantém a ordem das chaves) + campos dinâmicos
+        stats = self._stats_static.copy()
+        stats.update(
+            is_running=self.is_running,
+            total_data_points=self._n,
+            api_errors=self.api_errors,
+            last_fetch_time=last_fetch_time,
+            last_fetch_time_iso=self._last_fetch_iso[1],
+            last_price=self.last_successful_price,
+            queue_size=self._n,
+            subscribers_count=len(self.subscribers)
+        )
+        return stats
     
     def get_current_price(self) -> Optional[float]:
         """Retorna preço atual se disponível"""
-        if self.data_queue:
-            return self.data_queue[-1].price
-        return None
\ No newline at end of file
+        if self._n:
+            return int(self._price_ticks[self._head - 1]) / self._scale
+        return None
+
+
+class MultiAssetBatchFetcher:
+    """
+    Busca os tickers de todos os streamers registrados numa única requisição
+    /ticker/24hr?symbols=[...] e entrega cada linha ao streamer dono via _ingest().
+    Um único thread, no menor fetch_interval entre os streamers.
+    """
+    
+    _startup_delay = 1.0
+    
+    def __init__(self):
+        self._streamers: Dict[str, GenericAssetStreamer] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    def register(self, streamer: GenericAssetStreamer):
+        """Registra streamer e inicia o thread de fetch se necessário"""
+        with self._lock:
+            self._streamers[streamer.binance_symbol] = streamer
+            if self._thread is None or not self._thread.is_alive():
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(target=self._worker, args=(self._stop_event,), daemon=True)
+                self._thread.start()
+                logger.info("[BATCH] Batch fetcher iniciado.")
+        logger.info(f"[BATCH] {streamer.binance_symbol} registrado. Total: {len(self._streamers)}")
+    
+    def unregister(self, streamer: GenericAssetStreamer):
+        """Remove streamer; para o thread quando não sobra nenhum"""
+        with self._lock:
+            self._streamers.pop(streamer.binance_symbol, None)
+            thread = None
+            if not self._streamers and self._thread is not None:
+                self._stop_event.set()
+                thread, self._thread = self._thread, None
+        
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=15)
+            if thread.is_alive():
+                logger.warning("[BATCH] Thread não terminou graciosamente.")
+            else:
+                logger.info("[BATCH] Batch fetcher finalizado.")
+    
+    def _interval(self) -> float:
+        """Menor fetch_interval entre os streamers registrados"""
+        with self._lock:
+            return min((s.fetch_interval for s in self._streamers.values()), default=300)
+    
+    def fetch_once(self) -> int:
+        """Faz uma requisição para os streamers com fetch vencido. Retorna quantos receberam dados"""
+        with self._lock:
+            due = [s for s in self._streamers.values()
+                   if s._can_fetch_from_api() and s.api_errors < s.max_consecutive_errors]
+        if not due:
+            return 0
+        
+        symbols = json.dumps([s.binance_symbol for s in due], separators=(',', ':'))
+        started = time.monotonic()
+        try:
+            response = GenericAssetStreamer._get_http_session().get(
+                app_config.BINANCE_API_URL, params={'symbols': symbols}, timeout=10
+            )
+            response.raise_for_status()
+            rows = _json_loads(response.content)
+        except requests.exceptions.RequestException as e:
+            for streamer in due:
+                streamer._handle_api_error(f"Erro de requisição (batch): {e}")
+            return 0
+        except ValueError as e:
+            for streamer in due:
+                streamer._handle_api_error(f"Erro de conversão de dados (batch): {e}")
+            return 0
+        
+        by_symbol = {s.binance_symbol: s for s in due}
+        delivered = 0
+        for row in rows:
+            streamer = by_symbol.get(row.get('symbol'))
+            if streamer is not None and streamer.is_running:
+                streamer._ingest(row, started)
+                delivered += 1
+        return delivered
+    
+    def _worker(self, stop_event: threading.Event):
+        """Loop do thread de fetch em lote"""
+        # Os streamers se registram em sequência; esperar um pouco para o primeiro request já levar todos
+        stop_event.wait(self._startup_delay)
+        next_tick = time.monotonic()
+        while not stop_event.is_set():
+            try:
+                self.fetch_once()
+            except Exception as e:
+                logger.critical(f"[BATCH] Erro crítico no thread: {e}")
+            next_tick = _next_deadline(next_tick, self._interval())
+            stop_event.wait(max(0.0, next_tick - time.monotonic()))
+
+
+class StreamerScheduler:
+    """
+    Um único thread daemon que executa os polls de todos os streamers registrados,
+    numa min-heap ordenada pelo próximo deadline (relógio monotônico).
+    """
+    
+    def __init__(self):
+        self._heap = []
+        self._active: Dict[GenericAssetStreamer, object] = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._thread = None
+    
+    def register(self, streamer: GenericAssetStreamer):
+        """Agenda o streamer para poll imediato e inicia o thread se necessário"""
+        token = object()
+        with self._cond:
+            self._active[streamer] = token
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), streamer, token))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, daemon=True)
+                self._thread.start()
+                logger.info("[SCHEDULER] Streamer scheduler iniciado.")
+            self._cond.notify()
+    
+    def unregister(self, streamer: GenericAssetStreamer):
+        """Remove o streamer; entradas antigas na heap são descartadas quando saem"""
+        with self._cond:
+            self._active.pop(streamer, None)
+            self._cond.notify()
+    
+    def _next_due(self):
+        """Bloqueia até o próximo poll vencer. Retorna (streamer, token, deadline) ou None para encerrar"""
+        with self._cond:
+            while True:
+                if not self._active:
+                    self._heap.clear()
+                    self._thread = None
+                    return None
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                
+                deadline, _, streamer, token = self._heap[0]
+                if self._active.get(streamer) is not token:
+                    heapq.heappop(self._heap)  # entrada de um registro já cancelado
+                    continue
+                
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                
+                heapq.heappop(self._heap)
+                return streamer, token, deadline
+    
+    def _worker(self):
+        """Loop do thread de scheduling"""
+        while True:
+            due = self._next_due()
+            if due is None:
+                logger.info("[SCHEDULER] Streamer scheduler finalizado.")
+                return
+            
+            streamer, token, deadline = due
+            next_deadline = streamer._poll_once(deadline)
+            
+            with self._cond:
+                if self._active.get(streamer) is token:
+                    heapq.heappush(self._heap, (next_deadline, next(self._seq), streamer, token))
+
+
+# Scheduler compartilhado pelos streamers que não usam batch fetcher
+_default_scheduler = StreamerScheduler()
@@ -1,32 +1,87 @@
 # your_project/services/multi_asset_manager.py - ARQUIVO NOVO
 
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any
 from datetime import datetime, timedelta
+import copy
+import functools
+import heapq
 import sqlite3
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from utils.logging_config import logger
 from config import app_config
-from services.generic_asset_streamer import GenericAssetStreamer
+from services.generic_asset_streamer import GenericAssetStreamer, MultiAssetBatchFetcher
 from services.trading_analyzer import EnhancedTradingAnalyzer
 from database.setup import setup_trading_analyzer_db, setup_bitcoin_stream_db
 
+def _cached_overview(func):
+    """Memoiza o resultado dentro do OVERVIEW_TTL enquanto nenhum evento relevante invalidar o cache"""
+    @functools.wraps(func)
+    def wrapper(self):
+        # Sinais abertos/fechados (inclusive pelo SignalMonitor, fora do tick) invalidam o cache
+        signal_state = self._signal_state()
+        if signal_state != self._last_signal_state:
+            self._last_signal_state = signal_state
+            self.invalidate_overview()
+        
+        version = self._overview_version
+        now = time.monotonic()
+        cached = self._overview_cache.get(func.__name__)
+        if cached and cached[0] == version and now - cached[1] < self.OVERVIEW_TTL:
+            return copy.deepcopy(cached[2])
+        
+        result = func(self)
+        self._overview_cache[func.__name__] = (version, now, result)
+        # Chamador recebe cópia: rotas que alteram o dict não corrompem o cache compartilhado
+        return copy.deepcopy(result)
+    return wrapper
+
 class MultiAssetManager:
     """
     Gerenciador central para múltiplos assets.
     Coordena streamers, analyzers e fornece APIs consolidadas.
     """
     
+    # Validade (s) do cache de overview/health para dashboards que fazem polling
+    OVERVIEW_TTL = 3.0
+    # Validade (s) das chamadas por asset compartilhadas entre overview/health/asset_data
+    ASSET_CALL_TTL = 1.0
+    
     def __init__(self):
         """Inicializa o gerenciador multi-asset"""
-        self.streamers: Dict[str, GenericAssetStreamer] = {}
-        self.analyzers: Dict[str, EnhancedTradingAnalyzer] = {}
+        # Preenchidos só em _initialize_components e congelados depois (leituras sem lock);
+        # adicionar/remover assets exige recriar o manager
+        self.streamers: Mapping[str, GenericAssetStreamer] = {}
+        self.analyzers: Mapping[str, EnhancedTradingAnalyzer] = {}
         self.supported_assets = app_config.get_supported_asset_symbols()
-        self.lock = threading.Lock()
+        # Configs dos assets são estáticas: resolver uma vez
+        self._asset_configs = {s: app_config.get_asset_config(s) for s in self.supported_assets}
+        self._asset_names = {s: cfg['name'] for s, cfg in self._asset_configs.items()}
+        # Um lock por asset: start/stop de assets diferentes não se serializam
+        self._asset_locks = {s: threading.Lock() for s in self.supported_assets}
+        # Pool para o fan-out dos resumos por asset (SQLite/indicadores de cada analyzer são independentes)
+        self._summary_pool = ThreadPoolExecutor(
+            max_workers=max(1, min(8, len(self.supported_assets))),
+            thread_name_prefix='multi-summary'
+        )
+        # Cache de overview/health: (versão, instante, resultado); invalidate_overview() incrementa a versão
+        self._overview_cache: Dict[str, tuple] = {}
+        self._overview_version = 0
+        self._last_signal_state = ()
+        # Memo curto de stats/análise por asset: (asset, método) -> (instante, resultado)
+        self._asset_call_memo: Dict[tuple, tuple] = {}
+        # Um único request /ticker/24hr para todos os assets
+        self.batch_fetcher = MultiAssetBatchFetcher()
         
         logger.info(f"[MULTI] Inicializando Multi-Asset Manager para: {', '.join(self.supported_assets)}")
         
         self._setup_databases()
         self._initialize_components()
+        self.streamers = MappingProxyType(self.streamers)
+        self.analyzers = MappingProxyType(self.analyzers)
     
     def _setup_databases(self):
         """Configura bancos de dados para todos os assets"""
@@ -57,7 +112,8 @@ class MultiAssetManager:
                 streamer = GenericAssetStreamer(
                     asset_symbol=asset_symbol,
                     max_queue_size=app_config.MULTI_ASSET_MAX_QUEUE_SIZE,
-                    fetch_interval=app_config.ASSET_INTERVALS.get(asset_symbol, 300)
+                    fetch_interval=app_config.ASSET_INTERVALS.get(asset_symbol, 300),
+                    batch_fetcher=self.batch_fetcher
                 )
                 self.streamers[asset_symbol] = streamer
                 
@@ -66,9 +122,9 @@ class MultiAssetManager:
                 analyzer = EnhancedTradingAnalyzer(db_path=trading_db_path)
                 self.analyzers[asset_symbol] = analyzer
                 
-                # Conectar streamer ao analyzer
+                # Conectar streamer ao analyzer (analyzer já resolvido no callback)
                 streamer.add_subscriber(
-                    lambda data, asset=asset_symbol: self._feed_analyzer(asset, data)
+                    functools.partial(self._feed_analyzer, analyzer, asset_symbol)
                 )
                 
                 logger.info(f"[MULTI] Componentes inicializados para {asset_symbol}")
@@ -76,20 +132,39 @@ class MultiAssetManager:
             except Exception as e:
                 logger.error(f"[MULTI] Erro ao inicializar componentes para {asset_symbol}: {e}")
     
-    def _feed_analyzer(self, asset_symbol: str, data):
+    def _feed_analyzer(self, analyzer: EnhancedTradingAnalyzer, asset_symbol: str, data):
         """Alimenta o analyzer com dados do streamer"""
+        # O streamer só notifica BitcoinData já validado (_process_ticker), então não há checagem por tick.
+        # O try/except fica: sem exceção ele é gratuito no 3.11, e um erro que escapasse para o streamer
+        # faria o analyzer ser removido dos subscribers de vez.
         try:
-            analyzer = self.analyzers.get(asset_symbol)
-            if analyzer and data:
-                analyzer.add_price_data(
-                    timestamp=data.timestamp,
-                    price=data.price,
-                    volume=data.volume_24h
-                )
-                logger.debug(f"[MULTI] {asset_symbol} analyzer alimentado: ${data.price:.2f}")
+            analyzer.add_price_data(data.timestamp, data.price, data.volume_24h)
+            # %-style: a mensagem só é formatada se DEBUG estiver habilitado
+            logger.debug("[MULTI] %s analyzer alimentado: $%.2f", asset_symbol, data.price)
         except Exception as e:
             logger.error(f"[MULTI] Erro ao alimentar analyzer {asset_symbol}: {e}")
     
+    def _asset_call(self, asset_symbol: str, method):
+        """Executa um método de streamer/analyzer reaproveitando o resultado por ASSET_CALL_TTL"""
+        key = (asset_symbol, method.__name__)
+        now = time.monotonic()
+        cached = self._asset_call_memo.get(key)
+        if cached and now - cached[0] < self.ASSET_CALL_TTL:
+            return cached[1]
+        
+        result = method()
+        self._asset_call_memo[key] = (now, result)
+        return result
+    
+    def _signal_state(self) -> tuple:
+        """(sinais em memória, sinais fechados) por analyzer: muda quando um sinal abre ou fecha"""
+        return tuple((len(analyzer.signals), analyzer._closed_count) for analyzer in self.analyzers.values())
+    
+    def invalidate_overview(self):
+        """Descarta overview/health em cache (novo sinal, start/stop de streaming)"""
+        self._overview_version += 1
+        self._asset_call_memo.clear()
+    
     def start_streaming(self, assets: Optional[List[str]] = None):
         """
         Inicia streaming para assets especificados ou todos.
@@ -100,16 +175,18 @@ class MultiAssetManager:
         if assets is None:
             assets = self.supported_assets
         
-        with self.lock:
-            for asset_symbol in assets:
-                if asset_symbol in self.streamers:
+        for asset_symbol in assets:
+            if asset_symbol in self.streamers:
+                with self._asset_locks[asset_symbol]:
                     try:
                         self.streamers[asset_symbol].start_streaming()
                         logger.info(f"[MULTI] Streaming iniciado para {asset_symbol}")
                     except Exception as e:
                         logger.error(f"[MULTI] Erro ao iniciar streaming {asset_symbol}: {e}")
-                else:
-                    logger.warning(f"[MULTI] Asset não suportado: {asset_symbol}")
+            else:
+                logger.warning(f"[MULTI] Asset não suportado: {asset_symbol}")
+        
+        self.invalidate_overview()
     
     def stop_streaming(self, assets: Optional[List[str]] = None):
         """
@@ -121,14 +198,16 @@ class MultiAssetManager:
         if assets is None:
             assets = self.supported_assets
         
-        with self.lock:
-            for asset_symbol in assets:
-                if asset_symbol in self.streamers:
+        for asset_symbol in assets:
+            if asset_symbol in self.streamers:
+                with self._asset_locks[asset_symbol]:
                     try:
                         self.streamers[asset_symbol].stop_streaming()
                         logger.info(f"[MULTI] Streaming parado para {asset_symbol}")
                     except Exception as e:
                         logger.error(f"[MULTI] Erro ao parar streaming {asset_symbol}: {e}")
+        
+        self.invalidate_overview()
     
     def get_asset_streamer(self, asset_symbol: str) -> Optional[GenericAssetStreamer]:
         """Retorna streamer do asset específico"""
@@ -138,6 +217,7 @@ class MultiAssetManager:
         """Retorna analyzer do asset específico"""
         return self.analyzers.get(asset_symbol.upper())
     
+    @_cached_overview
     def get_overview_data(self) -> Dict[str, Any]:
         """Retorna overview consolidado de todos os assets"""
         overview = {
@@ -151,9 +231,14 @@ class MultiAssetManager:
             'performance_comparison': {}
         }
         
+        futures = {
+            asset_symbol: self._summary_pool.submit(self._get_asset_summary, asset_symbol)
+            for asset_symbol in self.supported_assets
+        }
+        
         for asset_symbol in self.supported_assets:
             try:
-                asset_data = self._get_asset_summary(asset_symbol)
+                asset_data = futures[asset_symbol].result()
                 overview['assets'][asset_symbol] = asset_data
                 
                 # Atualizar totais
@@ -176,7 +261,7 @@ class MultiAssetManager:
         """Retorna resumo de um asset específico"""
         streamer = self.streamers.get(asset_symbol)
         analyzer = self.analyzers.get(asset_symbol)
-        asset_config = app_config.get_asset_config(asset_symbol)
+        asset_config = self._asset_configs[asset_symbol]
         
         summary = {
             'symbol': asset_symbol,
@@ -199,7 +284,7 @@ class MultiAssetManager:
         
         # Dados do streamer
         if streamer:
-            stream_stats = streamer.get_stream_statistics()
+            stream_stats = self._asset_call(asset_symbol, streamer.get_stream_statistics)
             summary['streaming'] = {
                 'is_running': stream_stats['is_running'],
                 'current_price': stream_stats['last_price'] or 0,
@@ -211,7 +296,7 @@ class MultiAssetManager:
         # Dados do analyzer
         if analyzer:
             try:
-                analysis = analyzer.get_comprehensive_analysis()
+                analysis = self._asset_call(asset_symbol, analyzer.get_comprehensive_analysis)
                 if 'error' not in analysis:
                     summary['trading'] = {
                         'total_signals': len(analyzer.signals),
@@ -242,8 +327,8 @@ class MultiAssetManager:
             # Comparar mudanças de preço 24h
             for asset_symbol in self.supported_assets:
                 streamer = self.streamers.get(asset_symbol)
-                if streamer and streamer.data_queue:
-                    recent_data = list(streamer.data_queue)
+                if streamer:
+                    recent_data = streamer.get_recent_data(1)
                     if len(recent_data) > 0:
                         latest = recent_data[-1]
                         comparison['price_changes_24h'][asset_symbol] = {
@@ -265,7 +350,7 @@ class MultiAssetManager:
                                 'net_profit': performance.get('overall_performance', {}).get('net_profit_pct', 0)
                             }
                     except Exception as e:
-                        logger.debug(f"[MULTI] Performance data não disponível para {asset_symbol}: {e}")
+                        logger.debug("[MULTI] Performance data não disponível para %s: %s", asset_symbol, e)
             
             # Análise de correlação básica (se habilitada)
             if app_config.CORRELATION_ANALYSIS_ENABLED:
@@ -285,57 +370,46 @@ class MultiAssetManager:
             price_data = {}
             for asset_symbol in self.supported_assets:
                 streamer = self.streamers.get(asset_symbol)
-                if streamer and streamer.data_queue:
-                    prices = [data.price for data in list(streamer.data_queue)[-50:]]  # Últimos 50 pontos
+                if streamer:
+                    prices = streamer.get_recent_prices(50)  # Últimos 50 pontos (view/array do ring buffer)
                     if len(prices) >= 10:  # Mínimo de dados para correlação
                         price_data[asset_symbol] = prices
             
-            # Calcular correlações par a par
-            asset_pairs = []
-            for i, asset1 in enumerate(price_data.keys()):
-                for asset2 in list(price_data.keys())[i+1:]:
-                    asset_pairs.append((asset1, asset2))
+            if len(price_data) < 2:
+                return correlations
+            
+            # Matriz de correlação de todos os pares num único cálculo (séries alinhadas pelo fim)
+            assets = list(price_data.keys())
+            length = min(len(prices) for prices in price_data.values())
+            matrix = self._calculate_correlation_matrix(
+                np.vstack([price_data[asset][-length:] for asset in assets])
+            )
             
-            for asset1, asset2 in asset_pairs:
-                try:
-                    correlation = self._calculate_correlation(price_data[asset1], price_data[asset2])
-                    correlations[f"{asset1}_{asset2}"] = correlation
-                except Exception as e:
-                    logger.debug(f"[MULTI] Erro ao calcular correlação {asset1}-{asset2}: {e}")
+            # Triângulo superior (i < j) na mesma ordem dos pares (asset1, asset2) de antes
+            rows, cols = np.triu_indices(len(assets), k=1)
+            for i, j, correlation in zip(rows.tolist(), cols.tolist(), matrix[rows, cols].tolist()):
+                correlations[f"{assets[i]}_{assets[j]}"] = round(correlation, 3)
                     
         except Exception as e:
             logger.error(f"[MULTI] Erro na análise de correlações: {e}")
         
         return correlations
     
-    def _calculate_correlation(self, prices1: List[float], prices2: List[float]) -> float:
-        """Calcula correlação simples entre duas séries de preços"""
-        if len(prices1) != len(prices2) or len(prices1) < 2:
-            return 0.0
-        
+    def _calculate_correlation_matrix(self, prices: np.ndarray) -> np.ndarray:
+        """Correlação de Pearson dos retornos entre as linhas de uma matriz (K assets x N preços)"""
         # Calcular retornos percentuais
-        returns1 = [(prices1[i] - prices1[i-1]) / prices1[i-1] for i in range(1, len(prices1))]
-        returns2 = [(prices2[i] - prices2[i-1]) / prices2[i-1] for i in range(1, len(prices2))]
-        
-        if len(returns1) < 2:
-            return 0.0
-        
-        # Calcular correlação de Pearson simplificada
-        mean1 = sum(returns1) / len(returns1)
-        mean2 = sum(returns2) / len(returns2)
-        
-        numerator = sum((returns1[i] - mean1) * (returns2[i] - mean2) for i in range(len(returns1)))
-        
-        sum_sq1 = sum((r - mean1) ** 2 for r in returns1)
-        sum_sq2 = sum((r - mean2) ** 2 for r in returns2)
-        
-        denominator = (sum_sq1 * sum_sq2) ** 0.5
-        
-        if denominator == 0:
-            return 0.0
-        
-        correlation = numerator / denominator
-        return round(correlation, 3)
+        returns = np.diff(prices, axis=1) / prices[:, :-1]
+        if returns.shape[1] < 2:
+            return np.zeros((prices.shape[0], prices.shape[0]))
+        
+        # Desvios em relação à média de cada asset; covariâncias de todos os pares num só produto
+        deviations = returns - returns.mean(axis=1, keepdims=True)
+        covariance = deviations @ deviations.T
+        norms = np.sqrt(np.diag(covariance))
+        denominator = np.outer(norms, norms)
+        
+        # Série sem variação não tem correlação definida: 0.0
+        return np.divide(covariance, denominator, out=np.zeros_like(covariance), where=denominator != 0)
     
     def get_asset_data(self, asset_symbol: str, limit: int = 100) -> Dict[str, Any]:
         """Retorna dados específicos de um asset"""
@@ -348,9 +422,10 @@ class MultiAssetManager:
             streamer = self.streamers.get(asset_symbol)
             analyzer = self.analyzers.get(asset_symbol)
             
+            # Resultados memoizados/compartilhados saem como cópia: a rota pode alterar o dict
             result = {
                 'asset_symbol': asset_symbol,
-                'config': app_config.get_asset_config(asset_symbol),
+                'config': copy.deepcopy(self._asset_configs[asset_symbol]),
                 'streaming_data': {},
                 'analysis_data': {},
                 'recent_data': []
@@ -358,12 +433,12 @@ class MultiAssetManager:
             
             # Dados do streamer
             if streamer:
-                result['streaming_data'] = streamer.get_stream_statistics()
+                result['streaming_data'] = copy.deepcopy(self._asset_call(asset_symbol, streamer.get_stream_statistics))
                 result['recent_data'] = [data.to_dict() for data in streamer.get_recent_data(limit)]
             
             # Dados do analyzer
             if analyzer:
-                result['analysis_data'] = analyzer.get_comprehensive_analysis()
+                result['analysis_data'] = copy.deepcopy(self._asset_call(asset_symbol, analyzer.get_comprehensive_analysis))
             
             return result
             
@@ -373,22 +448,30 @@ class MultiAssetManager:
     
     def get_consolidated_signals(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Retorna sinais consolidados de todos os assets"""
-        all_signals = []
-        
-        for asset_symbol in self.supported_assets:
-            analyzer = self.analyzers.get(asset_symbol)
-            if analyzer and analyzer.signals:
-                for signal in analyzer.signals[-limit:]:
-                    signal_data = signal.copy()
-                    signal_data['asset_symbol'] = asset_symbol
-                    signal_data['asset_name'] = app_config.get_asset_config(asset_symbol)['name']
-                    all_signals.append(signal_data)
-        
-        # Ordenar por timestamp mais recente
-        all_signals.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        
-        return all_signals[:limit]
+        candidates = (
+            (signal, asset_symbol)
+            for asset_symbol in self.supported_assets
+            for signal in self._recent_signals(asset_symbol, limit)
+        )
+        
+        # Top-`limit` por timestamp mais recente sem ordenar tudo (mesma ordem de sorted(..., reverse=True))
+        newest = heapq.nlargest(limit, candidates, key=lambda item: item[0].get('created_at', ''))
+        
+        # Materializar só os sinais que vão na resposta (dict simples: jsonify não serializa ChainMap)
+        asset_names = self._asset_names
+        return [
+            {**signal, 'asset_symbol': asset_symbol, 'asset_name': asset_names[asset_symbol]}
+            for signal, asset_symbol in newest
+        ]
     
+    def _recent_signals(self, asset_symbol: str, limit: int) -> List[Dict[str, Any]]:
+        """Últimos `limit` sinais em memória do analyzer do asset"""
+        analyzer = self.analyzers.get(asset_symbol)
+        if analyzer and analyzer.signals:
+            return analyzer.signals[-limit:]
+        return []
+    
+    @_cached_overview
     def get_system_health(self) -> Dict[str, Any]:
         """Retorna status de saúde do sistema multi-asset"""
         health = {
@@ -406,40 +489,16 @@ class MultiAssetManager:
         total_errors = 0
         active_streamers = 0
         
+        futures = {
+            asset_symbol: self._summary_pool.submit(self._get_asset_health, asset_symbol)
+            for asset_symbol in self.supported_assets
+        }
+        
         for asset_symbol in self.supported_assets:
-            asset_health = {
-                'streamer_running': False,
-                'analyzer_healthy': False,
-                'recent_errors': 0,
-                'data_points': 0,
-                'last_update': None
-            }
-            
-            # Status do streamer
-            streamer = self.streamers.get(asset_symbol)
-            if streamer:
-                stats = streamer.get_stream_statistics()
-                asset_health.update({
-                    'streamer_running': stats['is_running'],
-                    'recent_errors': stats['api_errors'],
-                    'data_points': stats['total_data_points'],
-                    'last_update': stats['last_fetch_time_iso']
-                })
-                
-                if stats['is_running']:
-                    active_streamers += 1
-                
-                total_errors += stats['api_errors']
-            
-            # Status do analyzer
-            analyzer = self.analyzers.get(asset_symbol)
-            if analyzer:
-                try:
-                    system_status = analyzer.get_system_status()
-                    asset_health['analyzer_healthy'] = 'error' not in system_status
-                except Exception as e:
-                    asset_health['analyzer_healthy'] = False
-                    logger.debug(f"[MULTI] Analyzer health check failed para {asset_symbol}: {e}")
+            asset_health = futures[asset_symbol].result()
+            if asset_health['streamer_running']:
+                active_streamers += 1
+            total_errors += asset_health['recent_errors']
             
             health['assets_status'][asset_symbol] = asset_health
         
@@ -459,19 +518,59 @@ class MultiAssetManager:
         
         return health
     
+    def _get_asset_health(self, asset_symbol: str) -> Dict[str, Any]:
+        """Retorna status de saúde de um asset específico"""
+        asset_health = {
+            'streamer_running': False,
+            'analyzer_healthy': False,
+            'recent_errors': 0,
+            'data_points': 0,
+            'last_update': None
+        }
+        
+        # Status do streamer
+        streamer = self.streamers.get(asset_symbol)
+        if streamer:
+            stats = self._asset_call(asset_symbol, streamer.get_stream_statistics)
+            asset_health.update({
+                'streamer_running': stats['is_running'],
+                'recent_errors': stats['api_errors'],
+                'data_points': stats['total_data_points'],
+                'last_update': stats['last_fetch_time_iso']
+            })
+        
+        # Status do analyzer
+        analyzer = self.analyzers.get(asset_symbol)
+        if analyzer:
+            try:
+                system_status = self._asset_call(asset_symbol, analyzer.get_system_status)
+                asset_health['analyzer_healthy'] = 'error' not in system_status
+            except Exception as e:
+                asset_health['analyzer_healthy'] = False
+                logger.debug("[MULTI] Analyzer health check failed para %s: %s", asset_symbol, e)
+        
+        return asset_health
+    
     def shutdown(self):
         """Desliga todos os componentes graciosamente"""
         logger.info("[MULTI] Iniciando shutdown do Multi-Asset Manager...")
         
         # Parar todos os streamers
         self.stop_streaming()
+        GenericAssetStreamer.close_http_session()
         
-        # Salvar estado dos analyzers
-        for asset_symbol, analyzer in self.analyzers.items():
+        # Salvar estado dos analyzers em paralelo (um banco por asset: os commits/fsyncs se sobrepõem)
+        futures = {
+            asset_symbol: self._summary_pool.submit(analyzer.save_analyzer_state)
+            for asset_symbol, analyzer in self.analyzers.items()
+        }
+        for asset_symbol, future in futures.items():
             try:
-                analyzer.save_analyzer_state()
+                future.result()
                 logger.info(f"[MULTI] Estado salvo para {asset_symbol}")
             except Exception as e:
                 logger.error(f"[MULTI] Erro ao salvar estado de {asset_symbol}: {e}")
         
+        self._summary_pool.shutdown(wait=True)
+        
         logger.info("[MULTI] Multi-Asset Manager desligado com sucesso")
\ No newline at end of file
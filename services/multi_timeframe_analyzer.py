@@ -2,11 +2,84 @@
 
 import numpy as np
 import sqlite3
-from collections import deque, defaultdict
+import atexit
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Optional, Tuple
 from utils.logging_config import logger
 from config import app_config
+from services import _ta_kernels
+
+
+class _CandleRing:
+    """Ring buffer SoA de candles OHLCV: um array NumPy contíguo por campo"""
+    
+    __slots__ = ('capacity', 'epochs', 'opens', 'highs', 'lows', 'closes', 'volumes', 'ticks', 'version', '_n', '_head')
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.epochs = np.zeros(capacity, dtype=np.int64)  # início do período (epoch em segundos)
+        self.opens = np.zeros(capacity)
+        self.highs = np.zeros(capacity)
+        self.lows = np.zeros(capacity)
+        self.closes = np.zeros(capacity)
+        self.volumes = np.zeros(capacity)
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.version = 0  # incrementado a cada escrita; identifica o conteúdo atual do ring
+        self._n = 0
+        self._head = 0
+    
+    def __len__(self) -> int:
+        return self._n
+    
+    @property
+    def last_epoch(self) -> Optional[int]:
+        """Início do candle mais recente (None se vazio)"""
+        return int(self.epochs[self._head - 1]) if self._n else None
+    
+    def append(self, epoch: int, open_price: float, high: float, low: float,
+               close: float, volume: float, tick_count: int = 1):
+        """Grava um novo candle na posição atual e avança o head"""
+        head = self._head
+        self.epochs[head] = epoch
+        self.opens[head] = open_price
+        self.highs[head] = high
+        self.lows[head] = low
+        self.closes[head] = close
+        self.volumes[head] = volume
+        self.ticks[head] = tick_count
+        self._head = (head + 1) % self.capacity
+        if self._n < self.capacity:
+            self._n += 1
+        self.version += 1
+    
+    def update_last(self, price: float, volume: float):
+        """Atualiza o candle mais recente com um novo tick"""
+        i = self._head - 1  # -1 quando head == 0: último slot do array
+        if price > self.highs[i]:
+            self.highs[i] = price
+        if price < self.lows[i]:
+            self.lows[i] = price
+        self.closes[i] = price
+        self.volumes[i] += volume
+        self.ticks[i] += 1
+        self.version += 1
+    
+    def last_row(self) -> Tuple:
+        """(epoch, open, high, low, close, volume, tick_count) do candle mais recente"""
+        i = self._head - 1
+        return (int(self.epochs[i]), float(self.opens[i]), float(self.highs[i]), float(self.lows[i]),
+                float(self.closes[i]), float(self.volumes[i]), int(self.ticks[i]))
+    
+    def window(self, buffer: np.ndarray) -> np.ndarray:
+        """Valores do buffer em ordem cronológica (view contígua enquanto não deu a volta)"""
+        head = self._head
+        if self._n <= head:
+            return buffer[head - self._n:head]
+        return np.concatenate((buffer[head:], buffer[:head]))
+
 
 class MultiTimeframeAnalyzer:
     """
@@ -61,9 +134,9 @@ class MultiTimeframeAnalyzer:
             }
         }
         
-        # Armazenamento em memória por timeframe
+        # Armazenamento em memória por timeframe (ring buffer SoA de candles)
         self.timeframe_data = {
-            tf: deque(maxlen=config['max_history']) 
+            tf: _CandleRing(config['max_history'])
             for tf, config in self.timeframe_configs.items()
         }
         
@@ -80,12 +153,90 @@ class MultiTimeframeAnalyzer:
             'position_trading': PositionTradingStrategy()
         }
         
+        # Última análise por timeframe: (versão do ring, resultado) — reaproveitada enquanto não chega tick novo
+        self._analysis_cache = {}
+        
+        # Escrita em lote: candles e sinais ficam em memória e vão ao banco numa única transação
+        # a cada _flush_every linhas ou _flush_interval segundos
+        self._ohlcv_buffer = []
+        self._signal_buffer = []
+        self._flush_every = 100
+        self._flush_interval = 30.0
+        self._last_flush = time.monotonic()
+        
+        # Conexão única reaproveitada por todos os métodos de banco
+        self._db_lock = threading.RLock()
+        self._conn = self._open_connection()
+        atexit.register(self.close)
+        
         self.init_database()
         self.load_historical_data()
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Abre a conexão persistente (WAL + cache de páginas maior)"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+    
+    def _maybe_flush(self):
+        """Descarrega os buffers quando atingem o tamanho ou o intervalo (chamado com _db_lock)"""
+        pending = len(self._ohlcv_buffer) + len(self._signal_buffer)
+        if pending >= self._flush_every or time.monotonic() - self._last_flush >= self._flush_interval:
+            self._flush_buffers()
+    
+    def _flush_buffers(self):
+        """Grava candles e sinais pendentes numa única transação"""
+        with self._db_lock:
+            self._last_flush = time.monotonic()
+            if self._conn is None or not (self._ohlcv_buffer or self._signal_buffer):
+                return
+            
+            candles, self._ohlcv_buffer = self._ohlcv_buffer, []
+            signals, self._signal_buffer = self._signal_buffer, []
+            try:
+                if candles:
+                    self._conn.executemany(f'''
+                        INSERT OR REPLACE INTO {self.asset_symbol}_ohlcv_data
+                        (timeframe, timestamp, open_price, high_price, low_price, close_price, volume, tick_count)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', candles)
+                
+                if signals:
+                    self._conn.executemany(f'''
+                        INSERT INTO {self.asset_symbol}_multi_signals
+                        (timeframe, strategy_type, timestamp, signal_type, entry_price,
+                         stop_loss, target_1, target_2, target_3, confidence,
+                         risk_reward_ratio, expected_hold_time)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', signals)
+                
+                self._conn.commit()
+                
+            except Exception as e:
+                self._conn.rollback()
+                logger.error(f"[MULTI-TF] Error flushing {len(candles)} candles / {len(signals)} signals: {e}")
+    
+    def close(self):
+        """Grava o que estiver pendente e fecha a conexão persistente"""
+        with self._db_lock:
+            if self._conn is None:
+                return
+            self._flush_buffers()
+            self._conn.close()
+            self._conn = None
+    
     def init_database(self):
         """Inicializa tabelas para dados multi-timeframe"""
-        conn = sqlite3.connect(self.db_path)
+        with self._db_lock:
+            self._create_tables()
+    
+    def _create_tables(self):
+        """Cria tabelas e índices (chamado com _db_lock)"""
+        conn = self._conn
         cursor = conn.cursor()
         
         try:
@@ -142,9 +293,8 @@ class MultiTimeframeAnalyzer:
             logger.info(f"[MULTI-TF] Database initialized for {self.asset_symbol}")
             
         except Exception as e:
+            conn.rollback()
             logger.error(f"[MULTI-TF] Database error for {self.asset_symbol}: {e}")
-        finally:
-            conn.close()
     
     def add_raw_data(self, timestamp: datetime, price: float, volume: float):
         """
@@ -153,7 +303,7 @@ class MultiTimeframeAnalyzer:
         try:
             # Adicionar aos buffers de agregação
             raw_data = {
-                'timestamp': timestamp,
+                'epoch': timestamp.timestamp(),
                 'price': price,
                 'volume': volume
             }
@@ -172,23 +322,22 @@ class MultiTimeframeAnalyzer:
             interval_seconds = config['interval_seconds']
             
             # Calcular timestamp alinhado ao timeframe
-            timestamp = raw_data['timestamp']
-            aligned_timestamp = self._align_timestamp(timestamp, interval_seconds)
+            aligned_epoch = self._align_timestamp(raw_data['epoch'], interval_seconds)
             
             # Verificar se já existe candle para este período
-            current_data = self.timeframe_data[timeframe]
+            ring = self.timeframe_data[timeframe]
+            price = raw_data['price']
             
-            if current_data and current_data[-1]['timestamp'] == aligned_timestamp:
+            if ring.last_epoch == aligned_epoch:
                 # Atualizar candle existente
-                self._update_ohlcv_candle(current_data[-1], raw_data)
+                ring.update_last(price, raw_data['volume'])
             else:
                 # Criar novo candle
-                new_candle = self._create_new_candle(aligned_timestamp, raw_data)
-                self.timeframe_data[timeframe].append(new_candle)
+                ring.append(aligned_epoch, price, price, price, price, raw_data['volume'])
                 
                 # Salvar no banco se timeframe >= 5m (para economizar espaço)
                 if interval_seconds >= 300:
-                    self._save_ohlcv_to_database(timeframe, new_candle)
+                    self._save_ohlcv_to_database(timeframe, ring.last_row())
                 
                 # Triggerar análise para este timeframe
                 self._analyze_timeframe(timeframe)
@@ -196,56 +345,27 @@ class MultiTimeframeAnalyzer:
         except Exception as e:
             logger.error(f"[MULTI-TF] Error processing {timeframe}: {e}")
     
-    def _align_timestamp(self, timestamp: datetime, interval_seconds: int) -> datetime:
-        """Alinha timestamp ao início do período"""
-        epoch = timestamp.timestamp()
-        aligned_epoch = (epoch // interval_seconds) * interval_seconds
-        return datetime.fromtimestamp(aligned_epoch)
-    
-    def _create_new_candle(self, timestamp: datetime, data: Dict) -> Dict:
-        """Cria novo candle OHLCV"""
-        return {
-            'timestamp': timestamp,
-            'open': data['price'],
-            'high': data['price'],
-            'low': data['price'],
-            'close': data['price'],
-            'volume': data['volume'],
-            'tick_count': 1
-        }
-    
-    def _update_ohlcv_candle(self, candle: Dict, new_data: Dict):
-        """Atualiza candle OHLCV existente"""
-        candle['high'] = max(candle['high'], new_data['price'])
-        candle['low'] = min(candle['low'], new_data['price'])
-        candle['close'] = new_data['price']
-        candle['volume'] += new_data['volume']
-        candle['tick_count'] += 1
+    def _align_timestamp(self, epoch: float, interval_seconds: int) -> int:
+        """Alinha timestamp (epoch em segundos) ao início do período"""
+        return int(epoch // interval_seconds) * interval_seconds
     
-    def _save_ohlcv_to_database(self, timeframe: str, candle: Dict):
-        """Salva candle OHLCV no banco de dados"""
+    def _save_ohlcv_to_database(self, timeframe: str, candle: Tuple):
+        """Enfileira candle OHLCV (linha de _CandleRing.last_row) para gravação em lote"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-                INSERT OR REPLACE INTO {self.asset_symbol}_ohlcv_data 
-                (timeframe, timestamp, open_price, high_price, low_price, close_price, volume, tick_count)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timeframe,
-                candle['timestamp'].isoformat(),
-                candle['open'],
-                candle['high'],
-                candle['low'],
-                candle['close'],
-                candle['volume'],
-                candle['tick_count']
-            ))
-            
-            conn.commit()
-            conn.close()
-            
+            epoch, open_price, high, low, close, volume, tick_count = candle
+            with self._db_lock:
+                self._ohlcv_buffer.append((
+                    timeframe,
+                    datetime.fromtimestamp(epoch).isoformat(),
+                    open_price,
+                    high,
+                    low,
+                    close,
+                    volume,
+                    tick_count
+                ))
+                self._maybe_flush()
+
         except Exception as e:
             logger.error(f"[MULTI-TF] Error saving {timeframe} candle: {e}")
     
@@ -254,14 +374,13 @@ class MultiTimeframeAnalyzer:
         try:
             config = self.timeframe_configs[timeframe]
             strategy_type = config['strategy_type']
-            data = list(self.timeframe_data[timeframe])
+            ring = self.timeframe_data[timeframe]
             
-            if len(data) < 50:  # Dados insuficientes
+            if len(ring) < 50:  # Dados insuficientes
                 return
             
             # Executar estratégia específica
-            strategy = self.strategies[strategy_type]
-            analysis = strategy.analyze(data, timeframe)
+            analysis = self._get_timeframe_analysis(timeframe, ring)
             
             if analysis and analysis.get('signal'):
                 self._process_signal(timeframe, strategy_type, analysis)
@@ -286,35 +405,25 @@ class MultiTimeframeAnalyzer:
             logger.error(f"[MULTI-TF] Error processing signal: {e}")
     
     def _save_signal_to_database(self, timeframe: str, strategy_type: str, signal: Dict, analysis: Dict):
-        """Salva sinal no banco de dados"""
+        """Enfileira sinal para gravação em lote"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-                INSERT INTO {self.asset_symbol}_multi_signals 
-                (timeframe, strategy_type, timestamp, signal_type, entry_price, 
-                 stop_loss, target_1, target_2, target_3, confidence, 
-                 risk_reward_ratio, expected_hold_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timeframe,
-                strategy_type,
-                datetime.now().isoformat(),
-                f"{signal['action']}_{strategy_type.upper()}",
-                signal['entry_price'],
-                signal.get('stop_loss'),
-                signal.get('targets', [0, 0, 0])[0] if signal.get('targets') else None,
-                signal.get('targets', [0, 0, 0])[1] if signal.get('targets') and len(signal['targets']) > 1 else None,
-                signal.get('targets', [0, 0, 0])[2] if signal.get('targets') and len(signal['targets']) > 2 else None,
-                signal['confidence'],
-                signal.get('risk_reward_ratio'),
-                signal.get('expected_hold_time')
-            ))
-            
-            conn.commit()
-            conn.close()
-            
+            with self._db_lock:
+                self._signal_buffer.append((
+                    timeframe,
+                    strategy_type,
+                    datetime.now().isoformat(),
+                    f"{signal['action']}_{strategy_type.upper()}",
+                    signal['entry_price'],
+                    signal.get('stop_loss'),
+                    signal.get('targets', [0, 0, 0])[0] if signal.get('targets') else None,
+                    signal.get('targets', [0, 0, 0])[1] if signal.get('targets') and len(signal['targets']) > 1 else None,
+                    signal.get('targets', [0, 0, 0])[2] if signal.get('targets') and len(signal['targets']) > 2 else None,
+                    signal['confidence'],
+                    signal.get('risk_reward_ratio'),
+                    signal.get('expected_hold_time')
+                ))
+                self._maybe_flush()
+
         except Exception as e:
             logger.error(f"[MULTI-TF] Error saving signal: {e}")
     
@@ -330,9 +439,9 @@ class MultiTimeframeAnalyzer:
             }
             
             # Análise por timeframe
-            for timeframe, data in self.timeframe_data.items():
-                if len(data) >= 20:
-                    tf_analysis = self._get_timeframe_analysis(timeframe, data)
+            for timeframe, ring in self.timeframe_data.items():
+                if len(ring) >= 20:
+                    tf_analysis = self._get_timeframe_analysis(timeframe, ring)
                     analysis['timeframes'][timeframe] = tf_analysis
             
             # Consensus de múltiplos timeframes
@@ -347,13 +456,20 @@ class MultiTimeframeAnalyzer:
             logger.error(f"[MULTI-TF] Error getting analysis: {e}")
             return {'error': str(e)}
     
-    def _get_timeframe_analysis(self, timeframe: str, data: List[Dict]) -> Dict:
-        """Análise específica de um timeframe"""
+    def _get_timeframe_analysis(self, timeframe: str, ring: _CandleRing) -> Dict:
+        """Análise específica de um timeframe (recalculada só quando o ring mudou)"""
+        version = ring.version
+        cached = self._analysis_cache.get(timeframe)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
         config = self.timeframe_configs[timeframe]
         strategy_type = config['strategy_type']
         strategy = self.strategies[strategy_type]
         
-        return strategy.analyze(data, timeframe)
+        analysis = strategy.analyze(ring.window(ring.closes), ring.window(ring.volumes), timeframe)
+        self._analysis_cache[timeframe] = (version, analysis)
+        return analysis
     
     def _calculate_multi_timeframe_consensus(self, timeframe_analyses: Dict) -> Dict:
         """Calcula consensus entre múltiplos timeframes"""
@@ -415,21 +531,17 @@ class MultiTimeframeAnalyzer:
     def _get_active_signals(self) -> Dict:
         """Retorna sinais ativos por timeframe"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute(f'''
-                SELECT timeframe, strategy_type, signal_type, entry_price, 
-                       confidence, created_at, expected_hold_time
-                FROM {self.asset_symbol}_multi_signals 
-                WHERE status = 'ACTIVE' 
-                ORDER BY created_at DESC
-                LIMIT 20
-            ''')
-            
-            results = cursor.fetchall()
-            conn.close()
-            
+            with self._db_lock:
+                self._flush_buffers()
+                results = self._conn.execute(f'''
+                    SELECT timeframe, strategy_type, signal_type, entry_price,
+                           confidence, created_at, expected_hold_time
+                    FROM {self.asset_symbol}_multi_signals
+                    WHERE status = 'ACTIVE'
+                    ORDER BY created_at DESC
+                    LIMIT 20
+                ''').fetchall()
+
             active_signals = {}
             for row in results:
                 tf = row[0]
@@ -454,33 +566,20 @@ class MultiTimeframeAnalyzer:
     def load_historical_data(self):
         """Carrega dados históricos do banco para inicialização"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             for timeframe in self.timeframe_configs.keys():
-                cursor.execute(f'''
-                    SELECT timestamp, open_price, high_price, low_price, close_price, volume, tick_count
-                    FROM {self.asset_symbol}_ohlcv_data 
-                    WHERE timeframe = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                ''', (timeframe, self.timeframe_configs[timeframe]['max_history']))
-                
-                rows = cursor.fetchall()
-                
+                with self._db_lock:
+                    rows = self._conn.execute(f'''
+                        SELECT timestamp, open_price, high_price, low_price, close_price, volume, tick_count
+                        FROM {self.asset_symbol}_ohlcv_data
+                        WHERE timeframe = ?
+                        ORDER BY timestamp DESC
+                        LIMIT ?
+                    ''', (timeframe, self.timeframe_configs[timeframe]['max_history'])).fetchall()
+
+                ring = self.timeframe_data[timeframe]
                 for row in reversed(rows):  # Ordem cronológica
-                    candle = {
-                        'timestamp': datetime.fromisoformat(row[0]),
-                        'open': row[1],
-                        'high': row[2],
-                        'low': row[3],
-                        'close': row[4],
-                        'volume': row[5],
-                        'tick_count': row[6]
-                    }
-                    self.timeframe_data[timeframe].append(candle)
-            
-            conn.close()
+                    ring.append(int(datetime.fromisoformat(row[0]).timestamp()), *row[1:])
+            
             logger.info(f"[MULTI-TF] Historical data loaded for {self.asset_symbol}")
             
         except Exception as e:
@@ -505,21 +604,17 @@ class ScalpingStrategy:
             'target_pct': 0.8
         }
     
-    def analyze(self, data: List[Dict], timeframe: str) -> Dict:
-        """Análise específica para scalping"""
+    def analyze(self, closes: np.ndarray, volumes: np.ndarray, timeframe: str) -> Dict:
+        """Análise específica para scalping (closes/volumes em ordem cronológica)"""
         try:
-            if len(data) < 20:
+            if len(closes) < 20:
                 return {'signal': None, 'reason': 'Insufficient data'}
             
-            # Extrair preços de fechamento
-            closes = np.array([candle['close'] for candle in data])
-            volumes = np.array([candle['volume'] for candle in data])
-            
             # Indicadores rápidos para scalping
             rsi = self._calculate_rsi(closes, self.config['rsi_period'])
-            sma_fast = np.mean(closes[-self.config['sma_fast']:])
-            sma_slow = np.mean(closes[-self.config['sma_slow']:])
-            volume_avg = np.mean(volumes[-10:])
+            sma_fast = _ta_kernels.sma(closes, self.config['sma_fast'])
+            sma_slow = _ta_kernels.sma(closes, self.config['sma_slow'])
+            volume_avg = _ta_kernels.sma(volumes, 10)
             current_volume = volumes[-1]
             
             # Lógica de scalping
@@ -587,27 +682,13 @@ class ScalpingStrategy:
     
     def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
         """Calcula RSI"""
-        if len(prices) < period + 1:
-            return 50.0
-        
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        return 100.0 - (100.0 / (1.0 + rs))
+        return float(_ta_kernels.rsi(np.asarray(prices, dtype=np.float64), period))
 
 
 class DayTradingStrategy:
     """Estratégia de Day Trading (5min-4h) - Usar configurações atuais"""
     
-    def analyze(self, data: List[Dict], timeframe: str) -> Dict:
+    def analyze(self, closes: np.ndarray, volumes: np.ndarray, timeframe: str) -> Dict:
         """Reutiliza a lógica atual do EnhancedTradingAnalyzer"""
         # Esta é basicamente a estratégia atual - está ótima!
         return {'signal': {'action': 'HOLD', 'confidence': 0}}
@@ -630,20 +711,17 @@ class SwingTradingStrategy:
             'target_multipliers': [1.2, 2.0, 3.5]
         }
     
-    def analyze(self, data: List[Dict], timeframe: str) -> Dict:
-        """Análise específica para swing trading"""
+    def analyze(self, closes: np.ndarray, volumes: np.ndarray, timeframe: str) -> Dict:
+        """Análise específica para swing trading (closes/volumes em ordem cronológica)"""
         try:
-            if len(data) < 50:
+            if len(closes) < 50:
                 return {'signal': None, 'reason': 'Insufficient data for swing analysis'}
             
-            closes = np.array([candle['close'] for candle in data])
-            volumes = np.array([candle['volume'] for candle in data])
-            
             # Indicadores para swing trading
             rsi = self._calculate_rsi(closes, self.config['rsi_period'])
-            sma_short = np.mean(closes[-self.config['sma_short']:])
-            sma_long = np.mean(closes[-self.config['sma_long']:])
-            sma_trend = np.mean(closes[-self.config['sma_trend']:]) if len(closes) >= self.config['sma_trend'] else sma_long
+            sma_short = _ta_kernels.sma(closes, self.config['sma_short'])
+            sma_long = _ta_kernels.sma(closes, self.config['sma_long'])
+            sma_trend = _ta_kernels.sma(closes, self.config['sma_trend']) if len(closes) >= self.config['sma_trend'] else sma_long
             
             # Análise de tendência
             trend_direction = self._analyze_trend(sma_short, sma_long, sma_trend)
@@ -788,27 +866,13 @@ class SwingTradingStrategy:
     
     def _calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
         """Calcula RSI (mesmo método das outras estratégias)"""
-        if len(prices) < period + 1:
-            return 50.0
-        
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        return 100.0 - (100.0 / (1.0 + rs))
+        return float(_ta_kernels.rsi(np.asarray(prices, dtype=np.float64), period))
 
 
 class PositionTradingStrategy:
     """Estratégia de Position Trading (1d+)"""
     
-    def analyze(self, data: List[Dict], timeframe: str) -> Dict:
+    def analyze(self, closes: np.ndarray, volumes: np.ndarray, timeframe: str) -> Dict:
         """Análise para position trading (longo prazo)"""
         # Implementação básica - foco em tendências de longo prazo
         return {'signal': {'action': 'HOLD', 'confidence': 0}}
\ No newline at end of file
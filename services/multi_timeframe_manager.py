@@ -135,6 +135,22 @@ class MultiTimeframeManager:
             for timeframe, config in self.timeframe_configs.items():
                 self._aggregate_to_timeframe(asset, timeframe, price, volume, timestamp_unix)
     
+    def add_tick_batch(self, asset: str, prices, volumes, timestamps: List[datetime]):
+        """
+        Adiciona vários ticks de uma vez (backtests/simulações) com uma única aquisição do lock.
+        Cada tick precisa do seu timestamp: com um instante único o lote viraria um só candle.
+        """
+        if not (len(prices) == len(volumes) == len(timestamps)):
+            raise ValueError(
+                f"Tamanhos diferentes no lote: prices={len(prices)}, volumes={len(volumes)}, timestamps={len(timestamps)}"
+            )
+        
+        with self.lock:
+            for price, volume, timestamp in zip(prices, volumes, timestamps):
+                timestamp_unix = int(timestamp.timestamp())
+                for timeframe in self.timeframe_configs:
+                    self._aggregate_to_timeframe(asset, timeframe, float(price), float(volume), timestamp_unix)
+    
     def _aggregate_to_timeframe(self, asset: str, timeframe: str, price: float, volume: float, timestamp_unix: int):
         """Agrega dados para um timeframe específico"""
         config = self.timeframe_configs[timeframe]
@@ -264,12 +280,12 @@ class MultiTimeframeManager:
         if len(prices) < period + 1:
             return 50.0
         
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        deltas = np.diff(prices[-(period + 1):])
+        gains = np.maximum(deltas, 0.0)
+        losses = np.maximum(-deltas, 0.0)
         
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
+        avg_gain = np.mean(gains)
+        avg_loss = np.mean(losses)
         
         if avg_loss == 0:
             return 100.0
@@ -503,20 +519,19 @@ if __name__ == "__main__":
     # Exemplo de uso
     manager = MultiTimeframeManager()
     
-    # Simular alguns ticks de dados
-    import random
+    # Simular alguns ticks de dados (gerados em lote)
+    rng = np.random.default_rng()
     base_price = 50000  # BTC
+    n_ticks = 1000
     
-    for i in range(1000):
-        # Simular variação de preço
-        price_change = random.uniform(-100, 100)
-        price = base_price + price_change
-        volume = random.uniform(0.1, 2.0)
-        
-        manager.add_tick_data('BTC', price, volume)
-        
-        # Simular tempo passando
-        time.sleep(0.01)  # 10ms por tick
+    prices = base_price + rng.uniform(-100, 100, size=n_ticks)
+    volumes = rng.uniform(0.1, 2.0, size=n_ticks)
+    
+    # Simular tempo passando: 10ms por tick, sem dormir
+    start = time.time()
+    timestamps = [datetime.fromtimestamp(start + i * 0.01) for i in range(n_ticks)]
+    
+    manager.add_tick_batch('BTC', prices, volumes, timestamps)
     
     # Testar análise multi-timeframe
     signal = manager.generate_multi_timeframe_signal('BTC')
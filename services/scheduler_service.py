@@ -285,12 +285,12 @@ class TradingScheduler:
         if len(prices) < period + 1:
             return 50.0
         
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        deltas = np.diff(prices[-(period + 1):])
+        gains = np.maximum(deltas, 0.0)
+        losses = np.maximum(-deltas, 0.0)
         
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
+        avg_gain = np.mean(gains)
+        avg_loss = np.mean(losses)
         
         if avg_loss == 0:
             return 100.0
@@ -31,6 +31,8 @@ class SignalMonitor:
         # Controle de duplicação
         self.processed_signals = set()
         self.last_price_update = {}
+        # Fechamento atômico: force_check_signals roda em threads próprias, concorrendo com o loop
+        self._close_lock = threading.Lock()
         
         logger.info("[MONITOR] Signal Monitor inicializado")
     
@@ -109,14 +111,13 @@ class SignalMonitor:
                         exit_status = self._check_exit_conditions(signal, current_price)
                         
                         if exit_status:
-                            # Fechar sinal
-                            signal['status'] = exit_status
-                            signal['exit_price'] = current_price
-                            signal['exit_time'] = datetime.now().isoformat()
-                            signal['updated_at'] = datetime.now().isoformat()
+                            # Fechar sinal (outra verificação concorrente pode já tê-lo fechado)
+                            if not self._mark_closed(signal, exit_status, current_price):
+                                continue
                             
                             # Persistir no banco
                             self._update_signal_in_db(signal)
+                            self.trading_analyzer.register_closed_signal(signal)
                             
                             logger.info(f"[MONITOR] Sinal #{signal_id} fechado: {exit_status} | P&L: {new_pnl:.2f}%")
                             closed_signals += 1
@@ -141,6 +142,19 @@ class SignalMonitor:
         except Exception as e:
             logger.error(f"[MONITOR] Erro ao verificar sinais ativos: {e}")
     
+    def _mark_closed(self, signal: Dict, exit_status: str, exit_price: float) -> bool:
+        """Fecha o sinal se ainda estiver ACTIVE (check-and-set sob lock). Retorna False se já fechado"""
+        with self._close_lock:
+            if signal.get('status') != 'ACTIVE':
+                return False
+            
+            now_iso = datetime.now().isoformat()
+            signal['status'] = exit_status
+            signal['exit_price'] = exit_price
+            signal['exit_time'] = now_iso
+            signal['updated_at'] = now_iso
+            return True
+    
     def _should_update_signal(self, signal_id: str, current_price: float) -> bool:
         """Verifica se sinal precisa ser atualizado"""
         if not signal_id:
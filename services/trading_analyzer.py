@@ -1,7 +1,14 @@
 # services/trading_analyzer.py - Versão com Signal Monitor Integrado
 
+import csv
+import operator
 import sqlite3
 import os
+import atexit
+import threading
+import time
+import bisect
+import math
 import numpy as np
 from collections import deque
 from datetime import datetime, timedelta
@@ -9,10 +16,70 @@ from typing import Dict, List, Optional, Tuple
 from utils.logging_config import logger
 from config import app_config
 from database.setup import setup_trading_analyzer_db
+from services import _ta_kernels
 import numpy as np
 import json
 from flask import Blueprint, jsonify, request, current_app, render_template
 
+# Templates das razões de confluência (formatados apenas com o valor numérico)
+_TPL_RSI_OVERSOLD = 'RSI oversold ({:.1f})'.format
+_TPL_RSI_OVERBOUGHT = 'RSI overbought ({:.1f})'.format
+_TPL_VOLUME_CONFIRMATION = 'Volume confirmation ({:.1f}x)'.format
+
+# Razões da confluência como bits (na ordem das regras); texto só é montado por _format_reasons
+_REASON_RSI_OVERSOLD = 1 << 0
+_REASON_RSI_OVERBOUGHT = 1 << 1
+_REASON_MACD_BULLISH = 1 << 2
+_REASON_MACD_BEARISH = 1 << 3
+_REASON_BB_LOWER = 1 << 4
+_REASON_BB_UPPER = 1 << 5
+_REASON_STOCH_OVERSOLD = 1 << 6
+_REASON_STOCH_OVERBOUGHT = 1 << 7
+_REASON_SMA_BULLISH = 1 << 8
+_REASON_SMA_BEARISH = 1 << 9
+_REASON_VOLUME = 1 << 10
+
+# (texto ou template, chave do valor formatado) por bit
+_REASON_TEXTS = (
+    (_TPL_RSI_OVERSOLD, 'rsi'),
+    (_TPL_RSI_OVERBOUGHT, 'rsi'),
+    ("MACD bullish", None),
+    ("MACD bearish", None),
+    ("Near lower BB", None),
+    ("Near upper BB", None),
+    ("Stochastic oversold", None),
+    ("Stochastic overbought", None),
+    ("SMA bullish cross", None),
+    ("SMA bearish cross", None),
+    (_TPL_VOLUME_CONFIRMATION, 'volume_ratio'),
+)
+
+
+def _format_reasons(signal_analysis: Dict) -> List[str]:
+    """Monta as razões legíveis a partir dos bits retornados pela confluência"""
+    bits = signal_analysis.get('reason_bits', 0)
+    reasons = []
+    for bit, (text, key) in enumerate(_REASON_TEXTS):
+        if bits >> bit & 1:
+            reasons.append(text(signal_analysis[key]) if key else text)
+    return reasons
+
+# Direção da tendência indexada por (cmp(sma_9, sma_21) + 1) * 3 + cmp(sma_21, sma_50) + 1
+_TREND_TABLE = (
+    'STRONG_BEAR', 'BEAR', 'BEAR',
+    'NEUTRAL', 'NEUTRAL', 'NEUTRAL',
+    'BULL', 'BULL', 'STRONG_BULL',
+)
+
+# Colunas exportadas para CSV (presentes em sinais gerados e carregados do banco)
+_CSV_SIGNAL_FIELDS = (
+    'id', 'timestamp', 'pattern_type', 'entry_price', 'target_price',
+    'stop_loss', 'confidence', 'status', 'created_at', 'profit_loss'
+)
+
+# Colunas lidas de trading_signals ao restaurar sinais ativos
+_SIGNAL_COLUMNS = _CSV_SIGNAL_FIELDS + ('activated',)
+
 # Função auxiliar para serializar objetos NumPy
 def convert_numpy_types(obj):
     """
@@ -41,12 +108,21 @@ class EnhancedTradingAnalyzer:
     def __init__(self, db_path: str = app_config.TRADING_ANALYZER_DB):
         self.db_path = db_path
         self.price_history = deque(maxlen=200)
-        self.volume_history = deque(maxlen=200)
-        self.ohlc_history = deque(maxlen=200)
+        
+        # Ring buffers NumPy (SoA) com preços/volumes para os indicadores
+        self._capacity = 200
+        self._prices = np.empty(self._capacity, dtype=np.float64)
+        self._volumes = np.empty(self._capacity, dtype=np.float64)
+        self._n = 0
+        self._head = 0
         self.analysis_count = 0
         self.signals = []
         self.last_analysis = None
         
+        # Contadores de sinais fechados para o win rate (semeados do banco)
+        self._closed_count = 0
+        self._wins_count = 0
+        
         # ===== NOVO: Signal Monitor =====
         self.signal_monitor = None
         self._bitcoin_streamer = None  # Referência para o BitcoinStreamer
@@ -74,6 +150,9 @@ class EnhancedTradingAnalyzer:
             'min_volume_ratio': 1.1,
         }
         
+        # Variações absolutas recentes para o ATR (janela deslizante do atr_period)
+        self._abs_changes = deque(maxlen=self.ta_params['atr_period'])
+        
         # Configuração de Sinais
         self.signal_config = {
             'max_active_signals': 10,  # Reduzido para evitar duplicação
@@ -94,6 +173,22 @@ class EnhancedTradingAnalyzer:
             'volume': 0.10
         }
         
+        # Faixas do volume_ratio: LOW (< 0.7), NORMAL (0.7 a 1.5), HIGH (> 1.5)
+        self._vol_edges = (0.7, math.nextafter(1.5, math.inf))
+        self._vol_labels = ('LOW', 'NORMAL', 'HIGH')
+        
+        # Escrita em lote: preços ficam em memória e vão ao banco a cada _flush_every ticks
+        self._price_buffer = deque()
+        self._flush_every = 100
+        self._saved_state = None  # Último (analysis_count, last_analysis) gravado em analyzer_state
+        self._checkpoint_interval = 60.0
+        self._last_checkpoint = time.monotonic()
+        
+        # Conexão única reaproveitada por todos os métodos de banco
+        self._db_lock = threading.RLock()
+        self._conn = self._open_connection()
+        atexit.register(self.close)
+        
         self.init_database()
         self.load_previous_data()
         
@@ -166,134 +261,134 @@ class EnhancedTradingAnalyzer:
         """Initialize database with enhanced schema"""
         setup_trading_analyzer_db(self.db_path)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            # Enhanced signals table com colunas para tracking
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS enhanced_signals (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT,
-                    signal_type TEXT,
-                    entry_price REAL,
-                    target_1 REAL,
-                    target_2 REAL,
-                    target_3 REAL,
-                    stop_loss REAL,
-                    confidence REAL,
-                    confluence_score REAL,
-                    risk_reward_ratio REAL,
-                    atr_value REAL,
-                    volume_confirmation BOOLEAN,
-                    status TEXT DEFAULT 'ACTIVE',
-                    entry_reason TEXT,
-                    indicators_snapshot TEXT,
-                    profit_loss REAL DEFAULT 0,
-                    max_profit REAL DEFAULT 0,
-                    max_drawdown REAL DEFAULT 0,
-                    exit_reason TEXT,
-                    exit_price REAL,
-                    exit_time TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Adicionar colunas de tracking se não existirem
-            try:
-                cursor.execute('ALTER TABLE trading_signals ADD COLUMN exit_price REAL')
-            except sqlite3.OperationalError:
-                pass
-            
-            try:
-                cursor.execute('ALTER TABLE trading_signals ADD COLUMN exit_time TEXT')
-            except sqlite3.OperationalError:
-                pass
-            
+        with self._db_lock:
+            cursor = self._conn.cursor()
             try:
-                cursor.execute('ALTER TABLE trading_signals ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
-            except sqlite3.OperationalError:
-                pass
-            
-            conn.commit()
-            logger.info("[ANALYZER] Database initialized")
-            
-        except Exception as e:
-            logger.error(f"[ANALYZER] Database initialization error: {e}")
-        finally:
-            conn.close()
+                # Enhanced signals table com colunas para tracking
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS enhanced_signals (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp TEXT,
+                        signal_type TEXT,
+                        entry_price REAL,
+                        target_1 REAL,
+                        target_2 REAL,
+                        target_3 REAL,
+                        stop_loss REAL,
+                        confidence REAL,
+                        confluence_score REAL,
+                        risk_reward_ratio REAL,
+                        atr_value REAL,
+                        volume_confirmation BOOLEAN,
+                        status TEXT DEFAULT 'ACTIVE',
+                        entry_reason TEXT,
+                        indicators_snapshot TEXT,
+                        profit_loss REAL DEFAULT 0,
+                        max_profit REAL DEFAULT 0,
+                        max_drawdown REAL DEFAULT 0,
+                        exit_reason TEXT,
+                        exit_price REAL,
+                        exit_time TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                
+                # Adicionar colunas de tracking se não existirem
+                try:
+                    cursor.execute('ALTER TABLE trading_signals ADD COLUMN exit_price REAL')
+                except sqlite3.OperationalError:
+                    pass
+                
+                try:
+                    cursor.execute('ALTER TABLE trading_signals ADD COLUMN exit_time TEXT')
+                except sqlite3.OperationalError:
+                    pass
+                
+                try:
+                    cursor.execute('ALTER TABLE trading_signals ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+                except sqlite3.OperationalError:
+                    pass
+                
+                self._conn.commit()
+                logger.info("[ANALYZER] Database initialized")
+                
+            except Exception as e:
+                self._conn.rollback()
+                logger.error(f"[ANALYZER] Database initialization error: {e}")
     
     def load_previous_data(self):
         """Load previous data from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Load price history
-            cursor.execute("""
-                SELECT timestamp, price, volume 
-                FROM price_history 
-                ORDER BY timestamp DESC 
-                LIMIT 200
-            """)
-            
-            rows = cursor.fetchall()
-            for row in reversed(rows):
-                self.price_history.append({
-                    'timestamp': datetime.fromisoformat(row[0]),
-                    'price': row[1],
-                    'volume': row[2] or 0
-                })
-                self.volume_history.append(row[2] or 0)
-            
-            # Load analyzer state
-            cursor.execute("SELECT analysis_count, last_analysis FROM analyzer_state WHERE id = 1")
-            state = cursor.fetchone()
-            if state:
-                self.analysis_count = state[0]
-                self.last_analysis = datetime.fromisoformat(state[1]) if state[1] else None
-            
-            # ===== LOAD APENAS SINAIS ATIVOS RECENTES =====
-            # Evitar carregar sinais duplicados ou muito antigos
-            cursor.execute("""
-                SELECT DISTINCT * FROM trading_signals 
-                WHERE status = 'ACTIVE' 
-                AND created_at > datetime('now', '-24 hours')
-                ORDER BY created_at DESC
-                LIMIT 50
-            """)
-            
-            signal_rows = cursor.fetchall()
-            signals_loaded = []
-            seen_ids = set()
-            
-            for row in signal_rows:
-                signal_id = row[0]
+            with self._db_lock:
+                cursor = self._conn.cursor()
                 
-                # Evitar duplicados pelo ID
-                if signal_id in seen_ids:
-                    continue
-                seen_ids.add(signal_id)
+                # Load price history
+                cursor.execute("""
+                    SELECT timestamp, price, volume 
+                    FROM price_history 
+                    ORDER BY timestamp DESC 
+                    LIMIT 200
+                """)
                 
-                signal = {
-                    'id': signal_id,
-                    'timestamp': row[1],
-                    'pattern_type': row[2],
-                    'entry_price': row[3],
-                    'target_price': row[4],
-                    'stop_loss': row[5],
-                    'confidence': row[6],
-                    'status': row[7],
-                    'created_at': row[8],
-                    'profit_loss': row[9] or 0,
-                    'activated': row[10] if len(row) > 10 else False
-                }
-                signals_loaded.append(signal)
-            
-            self.signals = signals_loaded
+                rows = cursor.fetchall()
+                rows.reverse()
+                for timestamp, price, volume in rows:
+                    volume = volume or 0
+                    self._track_abs_change(price)
+                    self.price_history.append({
+                        'timestamp': datetime.fromisoformat(timestamp),
+                        'price': price,
+                        'volume': volume
+                    })
+                    self._push_sample(price, volume)
+                
+                # Load analyzer state
+                cursor.execute("SELECT analysis_count, last_analysis FROM analyzer_state WHERE id = 1")
+                state = cursor.fetchone()
+                if state:
+                    self.analysis_count = state[0]
+                    self.last_analysis = datetime.fromisoformat(state[1]) if state[1] else None
+                    self._saved_state = (state[0], state[1])
+                
+                # Seed win rate counters
+                cursor.execute("""
+                    SELECT COUNT(*), SUM(CASE WHEN profit_loss > 0 THEN 1 ELSE 0 END)
+                    FROM trading_signals 
+                    WHERE status != 'ACTIVE'
+                """)
+                closed, wins = cursor.fetchone()
+                self._closed_count = closed
+                self._wins_count = wins or 0
+                
+                # ===== LOAD APENAS SINAIS ATIVOS RECENTES =====
+                # Evitar carregar sinais duplicados ou muito antigos
+                cursor.execute(f"""
+                    SELECT DISTINCT {', '.join(_SIGNAL_COLUMNS)} FROM trading_signals 
+                    WHERE status = 'ACTIVE' 
+                    AND created_at > datetime('now', '-24 hours')
+                    ORDER BY created_at DESC
+                    LIMIT 50
+                """)
+                
+                signal_rows = cursor.fetchall()
+                signals_loaded = []
+                seen_ids = set()
+                
+                for row in signal_rows:
+                    signal_id = row[0]
+                    
+                    # Evitar duplicados pelo ID
+                    if signal_id in seen_ids:
+                        continue
+                    seen_ids.add(signal_id)
+                    
+                    signal = dict(zip(_SIGNAL_COLUMNS, row))
+                    signal['profit_loss'] = signal['profit_loss'] or 0
+                    signals_loaded.append(signal)
+                
+                self.signals = signals_loaded
             
-            conn.close()
             logger.info(f"[ANALYZER] Loaded {len(self.price_history)} price points and {len(self.signals)} active signals")
             
         except Exception as e:
@@ -303,22 +398,13 @@ class EnhancedTradingAnalyzer:
         """Add new price data for analysis"""
         try:
             # Add to history
+            self._track_abs_change(price)
             self.price_history.append({
                 'timestamp': timestamp,
                 'price': price,
                 'volume': volume
             })
-            self.volume_history.append(volume)
-            
-            # Simulate OHLC data for compatibility
-            self.ohlc_history.append({
-                'timestamp': timestamp,
-                'open': price,
-                'high': price * 1.001,
-                'low': price * 0.999,
-                'close': price,
-                'volume': volume
-            })
+            self._push_sample(price, volume)
             
             # Save to database
             self.save_price_data(timestamp, price, volume)
@@ -337,7 +423,6 @@ class EnhancedTradingAnalyzer:
                 if price_change > 0.005:  # Mudança > 0.5%
                     if self.signal_monitor:
                         # Agendar verificação (não bloquear)
-                        import threading
                         threading.Thread(
                             target=self.signal_monitor.force_check_signals, 
                             daemon=True
@@ -347,12 +432,30 @@ class EnhancedTradingAnalyzer:
             if len(self.price_history) >= 50:
                 self._comprehensive_market_analysis()
             
-            # Save state
-            self.save_analyzer_state()
-            
         except Exception as e:
             logger.error(f"[ANALYZER] Error adding price data: {e}")
     
+    def _track_abs_change(self, price):
+        """Registra |Δpreço| em relação ao último ponto (antes de anexá-lo ao histórico)"""
+        if self._n:
+            self._abs_changes.append(abs(price - float(self._prices[self._head - 1])))
+    
+    def _push_sample(self, price, volume):
+        """Grava preço/volume na posição atual do ring buffer"""
+        head = self._head
+        self._prices[head] = price
+        self._volumes[head] = volume
+        self._head = (head + 1) % self._capacity
+        if self._n < self._capacity:
+            self._n += 1
+    
+    def _window(self, buffer: np.ndarray) -> np.ndarray:
+        """Amostras do buffer em ordem cronológica (view contígua enquanto não deu a volta)"""
+        head = self._head
+        if self._n <= head:
+            return buffer[head - self._n:head]
+        return np.concatenate((buffer[head:], buffer[:head]))
+    
     def _comprehensive_market_analysis(self):
         """Análise completa do mercado"""
         try:
@@ -364,8 +467,8 @@ class EnhancedTradingAnalyzer:
             # Analyze market state
             market_state = self._analyze_market_state(indicators)
             
-            # Calculate signal confluence
-            signal_analysis = self._calculate_signal_confluence(indicators, market_state)
+            # Calculate signal confluence (só a decisão é usada aqui)
+            signal_analysis = self._calculate_signal_confluence(indicators, market_state, decision_only=True)
             
             # ===== GERAÇÃO DE SINAIS MAIS CRITERIOSA =====
             # Evitar gerar sinais duplicados
@@ -412,9 +515,9 @@ class EnhancedTradingAnalyzer:
                     return False
         
         # Check max active signals
-        active_signals = [s for s in self.signals if s.get('status') == 'ACTIVE']
-        if len(active_signals) >= self.signal_config['max_active_signals']:
-            logger.debug(f"[ANALYZER] Máximo de sinais ativos atingido ({len(active_signals)})")
+        active_signals = sum(1 for s in self.signals if s.get('status') == 'ACTIVE')
+        if active_signals >= self.signal_config['max_active_signals']:
+            logger.debug(f"[ANALYZER] Máximo de sinais ativos atingido ({active_signals})")
             return False
         
         # Volume confirmation required
@@ -428,10 +531,12 @@ class EnhancedTradingAnalyzer:
         try:
             atr = indicators.get('atr', current_price * 0.02)
             action = signal_analysis['action']
+            now = datetime.now()
+            now_iso = now.isoformat()
             
             # ===== GERAR ID ÚNICO =====
             # Usar timestamp mais precisão para evitar duplicação
-            signal_id = int(datetime.now().timestamp() * 1000) % 1000000
+            signal_id = int(now.timestamp() * 1000) % 1000000
             
             if action == 'BUY':
                 stop_loss = current_price - (atr * self.signal_config['stop_loss_atr_multiplier'])
@@ -458,7 +563,7 @@ class EnhancedTradingAnalyzer:
             
             signal = {
                 'id': signal_id,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso,
                 'pattern_type': signal_type,
                 'signal_type': signal_type,
                 'entry_price': current_price,
@@ -473,8 +578,8 @@ class EnhancedTradingAnalyzer:
                 'atr_value': round(atr, 2),
                 'volume_confirmation': signal_analysis['volume_confirmed'],
                 'status': 'ACTIVE',
-                'entry_reason': ' | '.join(signal_analysis['reasons']),
-                'created_at': datetime.now().isoformat(),
+                'entry_reason': ' | '.join(_format_reasons(signal_analysis)),
+                'created_at': now_iso,
                 'profit_loss': 0,
                 'max_profit': 0,
                 'max_drawdown': 0
@@ -526,9 +631,10 @@ class EnhancedTradingAnalyzer:
             # Format indicators for display
             technical_indicators = {}
             if indicators:
+                rsi = indicators.get('rsi', 50)
                 technical_indicators = {
-                    'RSI': round(indicators.get('rsi', 50), 2),
-                    'RSI_Signal': 'OVERSOLD' if indicators.get('rsi', 50) < 30 else 'OVERBOUGHT' if indicators.get('rsi', 50) > 70 else 'NEUTRAL',
+                    'RSI': round(rsi, 2),
+                    'RSI_Signal': 'OVERSOLD' if rsi < 30 else 'OVERBOUGHT' if rsi > 70 else 'NEUTRAL',
                     'MACD_Line': round(indicators.get('macd_line', 0), 4),
                     'MACD_Signal': round(indicators.get('macd_signal', 0), 4),
                     'MACD_Histogram': round(indicators.get('macd_histogram', 0), 4),
@@ -546,6 +652,10 @@ class EnhancedTradingAnalyzer:
                     'EMA_26': round(indicators.get('ema_26', 0), 2)
                 }
             
+            action = signal_analysis.get('action', 'HOLD')
+            confidence = signal_analysis.get('confidence', 0)
+            confluence = signal_analysis.get('confluence_score', 0)
+            
             # Construção do dicionário de análise
             analysis = {
                 'timestamp': datetime.now().isoformat(),
@@ -553,13 +663,13 @@ class EnhancedTradingAnalyzer:
                 'technical_indicators': technical_indicators,
                 'market_analysis': market_state,
                 'signal_analysis': {
-                    'recommended_action': signal_analysis.get('action', 'HOLD'),
-                    'confidence': round(signal_analysis.get('confidence', 0), 1),
-                    'confluence_score': round(signal_analysis.get('confluence_score', 0), 1),
+                    'recommended_action': action,
+                    'confidence': round(confidence, 1),
+                    'confluence_score': round(confluence, 1),
                     'bull_score': round(signal_analysis.get('bull_score', 0), 1),
                     'bear_score': round(signal_analysis.get('bear_score', 0), 1),
                     'volume_confirmed': signal_analysis.get('volume_confirmed', False),
-                    'reasons': signal_analysis.get('reasons', [])
+                    'reasons': _format_reasons(signal_analysis)
                 },
                 'active_signals': [
                     {
@@ -583,7 +693,7 @@ class EnhancedTradingAnalyzer:
                 'performance_summary': {
                     'total_signals_generated': len(self.signals),
                     'active_signals': len(active_signals),
-                    'closed_signals': len([s for s in self.signals if s.get('status') != 'ACTIVE']),
+                    'closed_signals': len(self.signals) - len(active_signals),
                     'win_rate': self._calculate_win_rate(),
                     'analysis_count': self.analysis_count
                 },
@@ -646,18 +756,20 @@ class EnhancedTradingAnalyzer:
             if self.signal_monitor:
                 self.signal_monitor.stop_monitoring()
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("DELETE FROM trading_signals")
-            cursor.execute("DELETE FROM enhanced_signals")
-            cursor.execute("DELETE FROM analyzer_state")
-            
-            conn.commit()
-            conn.close()
+            with self._db_lock:
+                cursor = self._conn.cursor()
+                
+                cursor.execute("DELETE FROM trading_signals")
+                cursor.execute("DELETE FROM enhanced_signals")
+                cursor.execute("DELETE FROM analyzer_state")
+                
+                self._conn.commit()
+                self._saved_state = None
             
             self.signals = []
             self.analysis_count = 0
+            self._closed_count = 0
+            self._wins_count = 0
             
             # Resetar tracking do monitor
             if self.signal_monitor:
@@ -667,6 +779,7 @@ class EnhancedTradingAnalyzer:
             logger.info("[ANALYZER] Signals and state reset")
             
         except Exception as e:
+            self._conn.rollback()
             logger.error(f"[ANALYZER] Error resetting signals: {e}")
     
     # ===== MANTER MÉTODOS EXISTENTES =====
@@ -679,48 +792,51 @@ class EnhancedTradingAnalyzer:
             return {}
         
         try:
-            prices = np.array([p['price'] for p in self.price_history])
-            volumes = np.array([v for v in self.volume_history])
+            prices = self._window(self._prices)
+            volumes = self._window(self._volumes)
+            
+            # Todas as varreduras da janela num único kernel
+            (sma_9, sma_21, sma_50, ema_12, ema_26, rsi, bb_upper, bb_middle, bb_lower,
+             stoch_k, volume_sma, support, resistance, trend_strength) = _ta_kernels.all_indicators(
+                prices, volumes, self.ta_params['rsi_period'])
             
             indicators = {}
             
             # Moving Averages
-            indicators['sma_9'] = self._calculate_sma(prices, 9)
-            indicators['sma_21'] = self._calculate_sma(prices, 21)
-            indicators['sma_50'] = self._calculate_sma(prices, 50) if len(prices) >= 50 else prices[-1]
-            indicators['ema_12'] = self._calculate_ema(prices, 12)
-            indicators['ema_26'] = self._calculate_ema(prices, 26)
+            indicators['sma_9'] = sma_9
+            indicators['sma_21'] = sma_21
+            indicators['sma_50'] = sma_50
+            indicators['ema_12'] = ema_12
+            indicators['ema_26'] = ema_26
             
             # RSI
-            indicators['rsi'] = self._calculate_rsi(prices, self.ta_params['rsi_period'])
+            indicators['rsi'] = rsi
             
             # MACD
-            macd_line, signal_line, histogram = self._calculate_macd(prices)
+            macd_line, signal_line, histogram = self._calculate_macd(prices, ema_12, ema_26)
             indicators['macd_line'] = macd_line
             indicators['macd_signal'] = signal_line
             indicators['macd_histogram'] = histogram
             
             # Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self._calculate_bollinger_bands(prices)
             indicators['bb_upper'] = bb_upper
             indicators['bb_middle'] = bb_middle
             indicators['bb_lower'] = bb_lower
             indicators['bb_position'] = (prices[-1] - bb_lower) / (bb_upper - bb_lower) if bb_upper != bb_lower else 0.5
             
             # Stochastic
-            stoch_k, stoch_d = self._calculate_stochastic(prices)
             indicators['stoch_k'] = stoch_k
-            indicators['stoch_d'] = stoch_d
+            indicators['stoch_d'] = stoch_k
             
             # Volume analysis
-            indicators['volume_sma'] = self._calculate_sma(volumes, 20)
-            indicators['volume_ratio'] = volumes[-1] / indicators['volume_sma'] if indicators['volume_sma'] > 0 else 1
+            indicators['volume_sma'] = volume_sma
+            indicators['volume_ratio'] = volumes[-1] / volume_sma if volume_sma > 0 else 1
             
             # Support/Resistance levels
-            indicators['support'], indicators['resistance'] = self._calculate_support_resistance(prices)
+            indicators['support'], indicators['resistance'] = support, resistance
             
             # Trend strength
-            indicators['trend_strength'] = self._calculate_trend_strength(prices)
+            indicators['trend_strength'] = trend_strength
             indicators['trend_direction'] = self._determine_trend_direction(indicators)
             
             # ATR (simplified)
@@ -756,12 +872,12 @@ class EnhancedTradingAnalyzer:
         if len(prices) < period + 1:
             return 50.0
         
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        deltas = np.diff(prices[-(period + 1):])
+        gains = np.maximum(deltas, 0.0)
+        losses = np.maximum(-deltas, 0.0)
         
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
+        avg_gain = np.mean(gains)
+        avg_loss = np.mean(losses)
         
         if avg_loss == 0:
             return 100.0
@@ -770,12 +886,15 @@ class EnhancedTradingAnalyzer:
         rsi = 100.0 - (100.0 / (1.0 + rs))
         return rsi
     
-    def _calculate_macd(self, prices: np.ndarray) -> Tuple[float, float, float]:
+    def _calculate_macd(self, prices: np.ndarray, ema_12: Optional[float] = None,
+                        ema_26: Optional[float] = None) -> Tuple[float, float, float]:
         if len(prices) < 26:
             return 0.0, 0.0, 0.0
         
-        ema_12 = self._calculate_ema(prices, 12)
-        ema_26 = self._calculate_ema(prices, 26)
+        if ema_12 is None:
+            ema_12 = self._calculate_ema(prices, 12)
+        if ema_26 is None:
+            ema_26 = self._calculate_ema(prices, 26)
         
         macd_line = ema_12 - ema_26
         signal_line = macd_line * 0.9
@@ -831,54 +950,29 @@ class EnhancedTradingAnalyzer:
         return support, resistance
     
     def _calculate_trend_strength(self, prices: np.ndarray) -> float:
-        if len(prices) < 20:
-            return 0.5
-        
-        recent_prices = prices[-20:]
-        
-        up_moves = []
-        down_moves = []
-        
-        for i in range(1, len(recent_prices)):
-            up_move = max(0, recent_prices[i] - recent_prices[i-1])
-            down_move = max(0, recent_prices[i-1] - recent_prices[i])
-            up_moves.append(up_move)
-            down_moves.append(down_move)
-        
-        avg_up = np.mean(up_moves)
-        avg_down = np.mean(down_moves)
-        
-        if avg_up + avg_down == 0:
-            return 0.5
-        
-        adx = abs(avg_up - avg_down) / (avg_up + avg_down)
-        return min(adx, 1.0)
+        return float(_ta_kernels.trend_strength(np.asarray(prices, dtype=np.float64)))
     
     def _determine_trend_direction(self, indicators: Dict) -> str:
-        sma_9 = indicators.get('sma_9', 0)
-        sma_21 = indicators.get('sma_21', 0)
-        sma_50 = indicators.get('sma_50', 0)
-        
-        if sma_9 > sma_21 > sma_50:
-            return 'STRONG_BULL'
-        elif sma_9 > sma_21:
-            return 'BULL'
-        elif sma_9 < sma_21 < sma_50:
-            return 'STRONG_BEAR'
-        elif sma_9 < sma_21:
-            return 'BEAR'
-        else:
-            return 'NEUTRAL'
+        # float(): comparações entre escalares NumPy geram np.bool_, que não aceita subtração
+        sma_9 = float(indicators.get('sma_9', 0))
+        sma_21 = float(indicators.get('sma_21', 0))
+        sma_50 = float(indicators.get('sma_50', 0))
+        
+        return _TREND_TABLE[((sma_9 > sma_21) - (sma_9 < sma_21) + 1) * 3
+                            + (sma_21 > sma_50) - (sma_21 < sma_50) + 1]
     
     def _calculate_atr(self, prices: np.ndarray, period: int = 14) -> float:
+        if period == self._abs_changes.maxlen:
+            # Janela mantida a cada tick: O(period) em vez de diff sobre todo o histórico
+            if not self._abs_changes:
+                return float(prices[-1] * 0.02)
+            return sum(self._abs_changes) / len(self._abs_changes)
+        
         if len(prices) < 2:
             return float(prices[-1] * 0.02)
         
-        changes = np.abs(np.diff(prices))
-        if len(changes) < period:
-            return float(np.mean(changes))
-        
-        return float(np.mean(changes[-period:]))
+        changes = np.abs(np.diff(prices[-(period + 1):]))
+        return float(np.mean(changes))
     
     def _analyze_market_state(self, indicators: Dict) -> Dict:
         if not indicators:
@@ -887,7 +981,7 @@ class EnhancedTradingAnalyzer:
         trend = indicators.get('trend_direction', 'NEUTRAL')
         
         volume_ratio = indicators.get('volume_ratio', 1)
-        volume_state = 'HIGH' if volume_ratio > 1.5 else 'LOW' if volume_ratio < 0.7 else 'NORMAL'
+        volume_state = self._vol_labels[bisect.bisect_right(self._vol_edges, volume_ratio)]
         
         volatility = 'NORMAL'
         
@@ -898,75 +992,83 @@ class EnhancedTradingAnalyzer:
             'bb_squeeze': False
         }
     
-    def _calculate_signal_confluence(self, indicators: Dict, market_state: Dict) -> Dict:
+    def _calculate_signal_confluence(self, indicators: Dict, market_state: Dict,
+                                     decision_only: bool = False) -> Dict:
+        """decision_only=True permite retornar HOLD cedo (sem scores/razões) quando o limiar é inalcançável"""
         if not indicators:
             return {'action': 'HOLD', 'confidence': 0, 'confluence_score': 0}
         
+        # Pesos/limiares em locais (podem ser alterados em runtime pelo config_manager)
+        weights = self.indicator_weights
+        params = self.ta_params
+        w_rsi, w_macd, w_bb = weights['rsi'], weights['macd'], weights['bb']
+        w_stoch, w_sma, w_volume = weights['stoch'], weights['sma_cross'], weights['volume']
+        min_volume_ratio = params['min_volume_ratio']
+        total_weight = w_rsi + w_macd + w_bb + w_stoch + w_sma + w_volume
+        
         bull_score = 0.0
         bear_score = 0.0
-        total_weight = 0.0
-        reasons = []
+        reason_bits = 0
         
         # RSI Analysis
         rsi = indicators.get('rsi', 50)
-        if rsi < self.ta_params['rsi_oversold']:
-            bull_score += self.indicator_weights['rsi']
-            reasons.append(f"RSI oversold ({rsi:.1f})")
-        elif rsi > self.ta_params['rsi_overbought']:
-            bear_score += self.indicator_weights['rsi']
-            reasons.append(f"RSI overbought ({rsi:.1f})")
-        total_weight += self.indicator_weights['rsi']
+        if rsi < params['rsi_oversold']:
+            bull_score += w_rsi
+            reason_bits |= _REASON_RSI_OVERSOLD
+        elif rsi > params['rsi_overbought']:
+            bear_score += w_rsi
+            reason_bits |= _REASON_RSI_OVERBOUGHT
         
         # MACD Analysis
         macd_histogram = indicators.get('macd_histogram', 0)
         if macd_histogram > 0:
-            bull_score += self.indicator_weights['macd']
-            reasons.append("MACD bullish")
+            bull_score += w_macd
+            reason_bits |= _REASON_MACD_BULLISH
         else:
-            bear_score += self.indicator_weights['macd']
-            reasons.append("MACD bearish")
-        total_weight += self.indicator_weights['macd']
+            bear_score += w_macd
+            reason_bits |= _REASON_MACD_BEARISH
         
         # Bollinger Bands
         bb_position = indicators.get('bb_position', 0.5)
         if bb_position < 0.2:
-            bull_score += self.indicator_weights['bb']
-            reasons.append("Near lower BB")
+            bull_score += w_bb
+            reason_bits |= _REASON_BB_LOWER
         elif bb_position > 0.8:
-            bear_score += self.indicator_weights['bb']
-            reasons.append("Near upper BB")
-        total_weight += self.indicator_weights['bb']
+            bear_score += w_bb
+            reason_bits |= _REASON_BB_UPPER
         
         # Stochastic
         stoch_k = indicators.get('stoch_k', 50)
-        if stoch_k < self.ta_params['stoch_oversold']:
-            bull_score += self.indicator_weights['stoch']
-            reasons.append("Stochastic oversold")
-        elif stoch_k > self.ta_params['stoch_overbought']:
-            bear_score += self.indicator_weights['stoch']
-            reasons.append("Stochastic overbought")
-        total_weight += self.indicator_weights['stoch']
+        if stoch_k < params['stoch_oversold']:
+            bull_score += w_stoch
+            reason_bits |= _REASON_STOCH_OVERSOLD
+        elif stoch_k > params['stoch_overbought']:
+            bear_score += w_stoch
+            reason_bits |= _REASON_STOCH_OVERBOUGHT
+        
+        # Nem SMA + volume no lado líder alcançam 60%: a decisão só pode ser HOLD
+        if decision_only and total_weight > 0 and \
+                (max(bull_score, bear_score) + w_sma + w_volume) / total_weight * 100 < 60:
+            return {'action': 'HOLD', 'confidence': 0, 'confluence_score': 0}
         
         # SMA Cross
         sma_9 = indicators.get('sma_9', 0)
         sma_21 = indicators.get('sma_21', 0)
         if sma_9 > sma_21:
-            bull_score += self.indicator_weights['sma_cross']
-            reasons.append("SMA bullish cross")
+            bull_score += w_sma
+            reason_bits |= _REASON_SMA_BULLISH
         else:
-            bear_score += self.indicator_weights['sma_cross']
-            reasons.append("SMA bearish cross")
-        total_weight += self.indicator_weights['sma_cross']
+            bear_score += w_sma
+            reason_bits |= _REASON_SMA_BEARISH
         
         # Volume confirmation
         volume_ratio = indicators.get('volume_ratio', 1)
-        if volume_ratio > self.ta_params['min_volume_ratio']:
+        if volume_ratio > min_volume_ratio:
             if bull_score > bear_score:
-                bull_score += self.indicator_weights['volume']
+                bull_score += w_volume
             else:
-                bear_score += self.indicator_weights['volume']
-            reasons.append(f"Volume confirmation ({volume_ratio:.1f}x)")
-        total_weight += self.indicator_weights['volume']
+                bear_score += w_volume
+            reason_bits |= _REASON_VOLUME
         
         # Calculate final scores
         bull_percentage = (bull_score / total_weight * 100) if total_weight > 0 else 0
@@ -990,102 +1092,153 @@ class EnhancedTradingAnalyzer:
             'confluence_score': confluence_score,
             'bull_score': bull_percentage,
             'bear_score': bear_percentage,
-            'reasons': reasons,
-            'volume_confirmed': volume_ratio > self.ta_params['min_volume_ratio']
+            'reason_bits': reason_bits,
+            'rsi': rsi,
+            'volume_ratio': volume_ratio,
+            'volume_confirmed': volume_ratio > min_volume_ratio
         }
     
+    def register_closed_signal(self, signal):
+        """Atualiza os contadores de win rate quando um sinal sai de ACTIVE"""
+        self._closed_count += 1
+        if signal.get('profit_loss', 0) > 0:
+            self._wins_count += 1
+    
     def _calculate_win_rate(self) -> float:
-        closed_signals = [s for s in self.signals if s.get('status') != 'ACTIVE']
-        if not closed_signals:
+        if not self._closed_count:
             return 0.0
 
-        wins = sum(1 for s in closed_signals if s.get('profit_loss', 0) > 0)
-        return (wins / len(closed_signals)) * 100.0
+        return (self._wins_count / self._closed_count) * 100.0
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Abre a conexão persistente (WAL + cache de páginas maior)"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
     
     def save_price_data(self, timestamp, price, volume):
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO price_history (timestamp, price, volume)
-                VALUES (?, ?, ?)
-            """, (timestamp.isoformat(), price, volume))
+        """Buffer price data; flushed to database every _flush_every ticks"""
+        self._price_buffer.append((timestamp.isoformat(), price, volume))
+        if len(self._price_buffer) >= self._flush_every:
+            self._flush_price_buffer()
+    
+    def _flush_price_buffer(self):
+        """Grava os preços pendentes e o estado do analyzer numa única transação"""
+        with self._db_lock:
+            if self._conn is None:
+                return
             
-            conn.commit()
-            conn.close()
+            state = (self.analysis_count, self.last_analysis.isoformat() if self.last_analysis else None)
+            if not self._price_buffer and state == self._saved_state:
+                return
             
-        except Exception as e:
-            logger.error(f"[ANALYZER] Error saving price data: {e}")
+            rows = list(self._price_buffer)
+            self._price_buffer.clear()
+            try:
+                if rows:
+                    self._conn.executemany("""
+                        INSERT INTO price_history (timestamp, price, volume)
+                        VALUES (?, ?, ?)
+                    """, rows)
+                
+                if state != self._saved_state:
+                    self._conn.execute("""
+                        INSERT OR REPLACE INTO analyzer_state (id, analysis_count, last_analysis)
+                        VALUES (1, ?, ?)
+                    """, state)
+                
+                self._conn.commit()
+                self._saved_state = state
+                self._maybe_checkpoint()
+                
+            except Exception as e:
+                self._conn.rollback()
+                logger.error(f"[ANALYZER] Error flushing price data: {e}")
     
-    def save_analyzer_state(self):
+    def _maybe_checkpoint(self):
+        """Trunca o WAL periodicamente para manter o arquivo -wal limitado (chamado com _db_lock)"""
+        now = time.monotonic()
+        if now - self._last_checkpoint < self._checkpoint_interval:
+            return
+        
+        self._last_checkpoint = now
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO analyzer_state (id, analysis_count, last_analysis)
-                VALUES (1, ?, ?)
-            """, (self.analysis_count, self.last_analysis.isoformat() if self.last_analysis else None))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            logger.error(f"[ANALYZER] Error saving analyzer state: {e}")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            logger.warning(f"[ANALYZER] WAL checkpoint failed: {e}")
+    
+    def save_analyzer_state(self):
+        """Persist analyzer state together with any buffered price data"""
+        self._flush_price_buffer()
+    
+    def close(self):
+        """Grava o que estiver pendente e fecha a conexão persistente"""
+        if self._conn is None:
+            return
+        
+        self._flush_price_buffer()
+        with self._db_lock:
+            self._conn.close()
+            self._conn = None
     
     def _save_signal(self, signal):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO trading_signals 
-                (timestamp, pattern_type, entry_price, target_price, stop_loss, 
-                 confidence, status, created_at, profit_loss, activated)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                signal['timestamp'],
-                signal['pattern_type'],
-                signal['entry_price'],
-                signal.get('target_price', signal.get('target_1', 0)),
-                signal['stop_loss'],
-                signal['confidence'],
-                signal['status'],
-                signal['created_at'],
-                signal['profit_loss'],
-                signal.get('activated', False)
-            ))
-            
-            # Also save to enhanced_signals table
-            cursor.execute("""
-                INSERT INTO enhanced_signals 
-                (timestamp, signal_type, entry_price, target_1, target_2, target_3,
-                 stop_loss, confidence, confluence_score, risk_reward_ratio, atr_value,
-                 volume_confirmation, status, entry_reason, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                signal['timestamp'],
-                signal.get('signal_type', signal['pattern_type']),
-                signal['entry_price'],
-                signal.get('target_1', signal.get('target_price', 0)),
-                signal.get('target_2', 0),
-                signal.get('target_3', 0),
-                signal['stop_loss'],
-                signal['confidence'],
-                signal.get('confluence_score', 0),
-                signal.get('risk_reward_ratio', 0),
-                signal.get('atr_value', 0),
-                signal.get('volume_confirmation', False),
-                signal['status'],
-                signal.get('entry_reason', ''),
-                signal['created_at']
-            ))
-            
-            conn.commit()
-            conn.close()
+            with self._db_lock:
+                cursor = self._conn.cursor()
+                
+                cursor.execute("""
+                    INSERT INTO trading_signals 
+                    (timestamp, pattern_type, entry_price, target_price, stop_loss, 
+                     confidence, status, created_at, profit_loss, activated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    signal['timestamp'],
+                    signal['pattern_type'],
+                    signal['entry_price'],
+                    signal.get('target_price', signal.get('target_1', 0)),
+                    signal['stop_loss'],
+                    signal['confidence'],
+                    signal['status'],
+                    signal['created_at'],
+                    signal['profit_loss'],
+                    signal.get('activated', False)
+                ))
+                
+                # Also save to enhanced_signals table
+                cursor.execute("""
+                    INSERT INTO enhanced_signals 
+                    (timestamp, signal_type, entry_price, target_1, target_2, target_3,
+                     stop_loss, confidence, confluence_score, risk_reward_ratio, atr_value,
+                     volume_confirmation, status, entry_reason, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (
+                    signal['timestamp'],
+                    signal.get('signal_type', signal['pattern_type']),
+                    signal['entry_price'],
+                    signal.get('target_1', signal.get('target_price', 0)),
+                    signal.get('target_2', 0),
+                    signal.get('target_3', 0),
+                    signal['stop_loss'],
+                    signal['confidence'],
+                    signal.get('confluence_score', 0),
+                    signal.get('risk_reward_ratio', 0),
+                    signal.get('atr_value', 0),
+                    signal.get('volume_confirmation', False),
+                    signal['status'],
+                    signal.get('entry_reason', ''),
+                    signal['created_at']
+                ))
+                
+                self._conn.commit()
             
         except Exception as e:
+            self._conn.rollback()
             logger.error(f"[ANALYZER] Error saving signal: {e}")
     
     def get_current_analysis(self) -> Dict:
@@ -1109,6 +1262,8 @@ class EnhancedTradingAnalyzer:
             elif isinstance(created_at, str):
                 last_signal_time_iso = created_at
 
+        active_signals = sum(1 for s in self.signals if s.get('status') == 'ACTIVE')
+
         status_data = {
             'system_info': {
                 'version': '2.1.0-enhanced-with-monitor',
@@ -1119,14 +1274,14 @@ class EnhancedTradingAnalyzer:
             },
             'data_status': {
                 'price_data_points': len(self.price_history),
-                'volume_data_points': len(self.volume_history),
+                'volume_data_points': self._n,
                 'data_quality': 'GOOD' if len(self.price_history) >= 50 else 'FAIR',
                 'last_data_timestamp': last_data_timestamp
             },
             'signal_status': {
                 'total_signals_generated': len(self.signals),
-                'active_signals': len([s for s in self.signals if s.get('status') == 'ACTIVE']),
-                'closed_signals': len([s for s in self.signals if s.get('status') != 'ACTIVE']),
+                'active_signals': active_signals,
+                'closed_signals': len(self.signals) - active_signals,
                 'last_signal_time': last_signal_time_iso
             },
             'performance_overview': {
@@ -1147,5 +1302,27 @@ class EnhancedTradingAnalyzer:
         pass
     
     def export_signals_to_csv(self, filename: str = None) -> str:
-        # [Código do método original]
-        pass
\ No newline at end of file
+        """Exporta os sinais em memória para CSV e retorna o caminho do arquivo"""
+        try:
+            if filename is None:
+                filename = os.path.join(
+                    app_config.DATA_DIR,
+                    f"signals_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+                )
+            
+            os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+            
+            # itemgetter monta a tupla da linha em C, sem reordenar chaves por linha
+            row_of = operator.itemgetter(*_CSV_SIGNAL_FIELDS)
+            
+            with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+                writer = csv.writer(f)
+                writer.writerow(_CSV_SIGNAL_FIELDS)
+                writer.writerows(row_of(s) for s in self.signals)
+            
+            logger.info(f"[ANALYZER] {len(self.signals)} sinais exportados para {filename}")
+            return filename
+            
+        except Exception as e:
+            logger.error(f"[ANALYZER] Error exporting signals: {e}")
+            return None
\ No newline at end of file
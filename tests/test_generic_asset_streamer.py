@@ -0,0 +1,186 @@
+# tests/test_generic_asset_streamer.py - Testes do streamer genérico, batch fetcher e scheduler
+
+import unittest
+import heapq
+import json
+import os
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+import requests
+
+# Ajustar path para imports
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.generic_asset_streamer import GenericAssetStreamer, MultiAssetBatchFetcher, StreamerScheduler
+
+
+def ticker(symbol, price):
+    """Linha do /ticker/24hr da Binance com os campos usados pelo streamer"""
+    return {'symbol': symbol, 'lastPrice': str(price), 'volume': '10.0', 'priceChangePercent': '1.5'}
+
+
+class TestPollOnce(unittest.TestCase):
+    """Testes do contador de falhas consecutivas em _poll_once"""
+
+    def setUp(self):
+        """Setup para cada teste"""
+        self.streamer = GenericAssetStreamer('BTC')
+        patcher = patch.object(self.streamer, '_fetch_binance_data')
+        self.fetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def poll(self, row):
+        self.fetch.return_value = row
+        self.streamer._poll_once(time.monotonic())
+        return self.streamer._consecutive_failures
+
+    def test_duplicate_tick_keeps_failure_count(self):
+        """Duplicado não zera nem incrementa o contador; inválido incrementa; aceito zera"""
+        self.assertEqual(self.poll(ticker('BTCUSDT', 60000.5)), 0)
+        self.streamer._consecutive_failures = 3
+
+        self.assertIsNone(self.streamer._process_ticker(ticker('BTCUSDT', 60000.5)))
+        self.assertEqual(self.poll(ticker('BTCUSDT', 60000.5)), 3)
+        self.assertEqual(self.poll(ticker('BTCUSDT', 5.0)), 4)
+        self.assertEqual(self.poll(None), 5)
+        self.assertEqual(self.poll(ticker('BTCUSDT', 60001.0)), 0)
+        self.assertEqual(len(self.streamer.get_recent_prices()), 2)
+
+
+class TestMultiAssetBatchFetcher(unittest.TestCase):
+    """Testes do MultiAssetBatchFetcher (uma requisição para todos os símbolos)"""
+
+    def setUp(self):
+        """Setup para cada teste"""
+        self.fetcher = MultiAssetBatchFetcher()
+        self.streamers = {}
+        for asset in ('BTC', 'ETH', 'SOL'):
+            streamer = GenericAssetStreamer(asset, batch_fetcher=self.fetcher)
+            streamer.is_running = True
+            # Registro direto, sem iniciar o thread de fetch
+            self.fetcher._streamers[streamer.binance_symbol] = streamer
+            self.streamers[asset] = streamer
+
+        self.session = MagicMock()
+        patcher = patch.object(GenericAssetStreamer, '_get_http_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def respond(self, rows):
+        self.session.get.return_value.content = json.dumps(rows).encode()
+
+    def requested_symbols(self):
+        return json.loads(self.session.get.call_args.kwargs['params']['symbols'])
+
+    def test_dispatch_per_symbol(self):
+        """Cada linha da resposta vai para o streamer do seu símbolo"""
+        self.respond([ticker('SOLUSDT', 150.25), ticker('BTCUSDT', 60000.5),
+                      ticker('ETHUSDT', 3000.75), ticker('XRPUSDT', 0.5)])
+
+        self.assertEqual(self.fetcher.fetch_once(), 3)
+
+        self.session.get.assert_called_once()
+        self.assertEqual(sorted(self.requested_symbols()), ['BTCUSDT', 'ETHUSDT', 'SOLUSDT'])
+        self.assertEqual(self.streamers['BTC'].get_current_price(), 60000.5)
+        self.assertEqual(self.streamers['ETH'].get_current_price(), 3000.75)
+        self.assertEqual(self.streamers['SOL'].get_current_price(), 150.25)
+
+    def test_streamer_at_error_limit_is_skipped(self):
+        """Streamer com api_errors no limite sai da requisição e não recebe dados"""
+        eth = self.streamers['ETH']
+        eth.api_errors = eth.max_consecutive_errors
+        self.respond([ticker('BTCUSDT', 60000.5), ticker('ETHUSDT', 3000.75), ticker('SOLUSDT', 150.25)])
+
+        self.assertEqual(self.fetcher.fetch_once(), 2)
+
+        self.assertEqual(sorted(self.requested_symbols()), ['BTCUSDT', 'SOLUSDT'])
+        self.assertIsNone(eth.get_current_price())
+        self.assertEqual(eth.api_errors, eth.max_consecutive_errors)
+
+    def test_request_errors_disable_streamers(self):
+        """Erros consecutivos de requisição contam para todos e, no limite, param os requests"""
+        self.session.get.side_effect = requests.exceptions.ConnectionError('offline')
+        limit = self.streamers['BTC'].max_consecutive_errors
+
+        for _ in range(limit):
+            self.assertEqual(self.fetcher.fetch_once(), 0)
+        for streamer in self.streamers.values():
+            self.assertEqual(streamer.api_errors, limit)
+
+        self.session.get.reset_mock()
+        self.assertEqual(self.fetcher.fetch_once(), 0)
+        self.session.get.assert_not_called()
+
+
+class TestStreamerScheduler(unittest.TestCase):
+    """Testes do StreamerScheduler (min-heap de deadlines)"""
+
+    def schedule(self, scheduler, streamer, deadline):
+        """Agenda uma entrada na heap sem iniciar o thread"""
+        token = object()
+        scheduler._active[streamer] = token
+        heapq.heappush(scheduler._heap, (deadline, next(scheduler._seq), streamer, token))
+
+    def test_due_in_deadline_order(self):
+        """Entradas vencidas saem em ordem de deadline, não de registro"""
+        scheduler = StreamerScheduler()
+        now = time.monotonic()
+        streamers = [MagicMock(name=f'streamer_{i}') for i in range(4)]
+        for streamer, offset in zip(streamers, (3.0, 1.0, 4.0, 2.0)):
+            self.schedule(scheduler, streamer, now - offset)
+
+        order = [scheduler._next_due()[0] for _ in streamers]
+
+        self.assertEqual(order, [streamers[2], streamers[0], streamers[3], streamers[1]])
+
+    def test_cancelled_entries_are_skipped(self):
+        """Entradas de registros cancelados ou substituídos são descartadas"""
+        scheduler = StreamerScheduler()
+        now = time.monotonic()
+        removed, replaced, kept = MagicMock(), MagicMock(), MagicMock()
+        self.schedule(scheduler, removed, now - 3.0)
+        self.schedule(scheduler, replaced, now - 2.0)
+        self.schedule(scheduler, kept, now - 1.0)
+        self.schedule(scheduler, replaced, now - 0.5)  # novo token invalida a entrada anterior
+        scheduler._active.pop(removed)
+
+        self.assertIs(scheduler._next_due()[0], kept)
+        streamer, token, deadline = scheduler._next_due()
+        self.assertIs(streamer, replaced)
+        self.assertEqual(deadline, now - 0.5)
+
+    def test_worker_polls_by_deadline(self):
+        """O thread reagenda cada streamer no deadline que _poll_once devolve"""
+        scheduler = StreamerScheduler()
+        calls = []
+        done = threading.Event()
+
+        def make_streamer(name, interval):
+            streamer = MagicMock(name=name)
+
+            def poll(deadline):
+                calls.append(name)
+                if len(calls) >= 5:
+                    done.set()
+                return deadline + interval
+            streamer._poll_once.side_effect = poll
+            return streamer
+
+        fast, slow = make_streamer('fast', 0.05), make_streamer('slow', 10.0)
+        scheduler.register(slow)
+        scheduler.register(fast)
+        try:
+            self.assertTrue(done.wait(5))
+        finally:
+            scheduler.unregister(fast)
+            scheduler.unregister(slow)
+
+        # slow só é chamado no registro; depois só fast vence
+        self.assertEqual(calls[:5], ['slow', 'fast', 'fast', 'fast', 'fast'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# tests/test_multi_asset_manager.py - Testes do Multi-Asset Manager
+
+import unittest
+import functools
+import os
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+# Ajustar path para imports
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.multi_asset_manager import MultiAssetManager
+
+
+class ManagerTestCase(unittest.TestCase):
+    """Base: manager sem bancos nem componentes reais (streamers/analyzers injetados por teste)"""
+
+    def setUp(self):
+        """Setup para cada teste"""
+        with patch.object(MultiAssetManager, '_setup_databases'), \
+             patch.object(MultiAssetManager, '_initialize_components'):
+            self.manager = MultiAssetManager()
+
+    def tearDown(self):
+        """Cleanup após cada teste"""
+        self.manager._summary_pool.shutdown(wait=True)
+
+
+class TestOverviewCache(ManagerTestCase):
+    """Testes do cache de overview (_cached_overview)"""
+
+    def setUp(self):
+        super().setUp()
+        self.analyzer = SimpleNamespace(signals=[{'id': 1, 'status': 'ACTIVE'}], _closed_count=0)
+        self.manager.analyzers = {'BTC': self.analyzer}
+        self.manager.supported_assets = ['BTC']
+        self.summary = MagicMock(side_effect=lambda asset: {
+            'streaming': {'is_running': True, 'data_points': 10},
+            'trading': {'total_signals': len(self.analyzer.signals)},
+        })
+        for name, mock in (('_get_asset_summary', self.summary),
+                           ('_calculate_performance_comparison', MagicMock(return_value={}))):
+            patcher = patch.object(self.manager, name, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_cached_result_is_a_copy(self):
+        """Alterar o dict retornado não altera o que o próximo chamador recebe"""
+        first = self.manager.get_overview_data()
+        first['totals']['total_signals'] = 99
+        first['assets']['BTC']['trading'].clear()
+
+        second = self.manager.get_overview_data()
+
+        self.assertEqual(self.summary.call_count, 1)
+        self.assertEqual(second['totals']['total_signals'], 1)
+        self.assertEqual(second['assets']['BTC']['trading'], {'total_signals': 1})
+
+    def test_signal_close_invalidates(self):
+        """Sinal fechado (mesma quantidade em memória) invalida o cache"""
+        self.manager.get_overview_data()
+        self.manager.get_overview_data()
+        self.assertEqual(self.summary.call_count, 1)
+
+        # SignalMonitor fecha o sinal: status muda e register_closed_signal conta o fechamento
+        self.analyzer.signals[0]['status'] = 'HIT_TARGET'
+        self.analyzer._closed_count += 1
+        self.manager.get_overview_data()
+        self.assertEqual(self.summary.call_count, 2)
+
+        self.analyzer.signals.append({'id': 2, 'status': 'ACTIVE'})
+        overview = self.manager.get_overview_data()
+        self.assertEqual(self.summary.call_count, 3)
+        self.assertEqual(overview['totals']['total_signals'], 2)
+
+
+class TestAssetData(ManagerTestCase):
+    """get_asset_data entrega cópias dos resultados memoizados por _asset_call"""
+
+    def setUp(self):
+        super().setUp()
+        self.calls = {'stats': 0, 'analysis': 0}
+
+        def get_stream_statistics():
+            self.calls['stats'] += 1
+            return {'is_running': True, 'last_price': 60000.0, 'asset_config': {'symbol': 'BTCUSDT'}}
+
+        def get_comprehensive_analysis():
+            self.calls['analysis'] += 1
+            return {'signal_analysis': {'recommended_action': 'BUY'}, 'active_signals': [{'id': 1}]}
+
+        self.manager.streamers = {'BTC': SimpleNamespace(get_stream_statistics=get_stream_statistics,
+                                                         get_recent_data=lambda limit: [])}
+        self.manager.analyzers = {'BTC': SimpleNamespace(get_comprehensive_analysis=get_comprehensive_analysis)}
+
+    def test_results_are_copies(self):
+        """Alterar o retorno não altera o memo, a config do asset nem o próximo chamador"""
+        first = self.manager.get_asset_data('BTC')
+        first['analysis_data']['signal_analysis']['recommended_action'] = 'SELL'
+        first['analysis_data']['active_signals'].clear()
+        first['streaming_data']['asset_config']['symbol'] = 'XXX'
+        first['config']['symbol'] = 'XXX'
+
+        second = self.manager.get_asset_data('BTC')
+
+        self.assertEqual(self.calls, {'stats': 1, 'analysis': 1})
+        self.assertEqual(second['analysis_data'], {'signal_analysis': {'recommended_action': 'BUY'},
+                                                   'active_signals': [{'id': 1}]})
+        self.assertEqual(second['streaming_data']['asset_config'], {'symbol': 'BTCUSDT'})
+        self.assertEqual(second['config']['symbol'], 'BTCUSDT')
+
+
+class TestFeedAnalyzer(ManagerTestCase):
+    """Testes do callback streamer -> analyzer"""
+
+    def setUp(self):
+        super().setUp()
+        self.analyzer = MagicMock()
+        self.callback = functools.partial(self.manager._feed_analyzer, self.analyzer, 'BTC')
+        self.data = SimpleNamespace(timestamp=datetime(2024, 1, 1), price=60000.0, volume_24h=1.5e9)
+
+    def test_feeds_price_data(self):
+        self.callback(self.data)
+        self.analyzer.add_price_data.assert_called_once_with(datetime(2024, 1, 1), 60000.0, 1.5e9)
+
+    def test_analyzer_error_does_not_propagate(self):
+        """Erro no analyzer não escapa para o streamer (que removeria o subscriber)"""
+        self.analyzer.add_price_data.side_effect = ValueError('boom')
+        self.callback(self.data)
+
+
+class TestPriceCorrelations(ManagerTestCase):
+    """Testes de _calculate_price_correlations"""
+
+    def streamer(self, prices):
+        return SimpleNamespace(get_recent_prices=lambda limit: prices[-limit:])
+
+    def expected(self, a, b):
+        returns_a, returns_b = np.diff(a) / a[:-1], np.diff(b) / b[:-1]
+        return round(float(np.corrcoef(returns_a, returns_b)[0, 1]), 3)
+
+    def test_unequal_lengths_align_by_tail(self):
+        """Séries de tamanhos diferentes são comparadas pelos pontos mais recentes"""
+        rng = np.random.default_rng(11)
+        btc = 60000.0 * np.cumprod(1 + rng.normal(0, 0.01, 80))   # 50 usados (limite do ring)
+        eth = btc[-30:] / 20.0                                    # mesmos retornos do fim de btc
+        sol = 150.0 * np.cumprod(1 + rng.normal(0, 0.01, 20))
+        self.manager.supported_assets = ['BTC', 'ETH', 'SOL']
+        self.manager.streamers = {'BTC': self.streamer(btc), 'ETH': self.streamer(eth), 'SOL': self.streamer(sol)}
+
+        correlations = self.manager._calculate_price_correlations()
+
+        # Janela comum = 20 pontos (SOL), alinhados pelo último preço
+        self.assertEqual(list(correlations), ['BTC_ETH', 'BTC_SOL', 'ETH_SOL'])
+        self.assertEqual(correlations['BTC_ETH'], 1.0)
+        self.assertEqual(correlations['BTC_SOL'], self.expected(btc[-20:], sol))
+        self.assertEqual(correlations['ETH_SOL'], self.expected(eth[-20:], sol))
+        # Alinhar pelo início daria outro valor
+        self.assertNotEqual(correlations['BTC_SOL'], self.expected(btc[-50:-30], sol))
+
+    def test_short_series_are_skipped(self):
+        """Assets com menos de 10 pontos ficam fora; com menos de 2 assets não há pares"""
+        prices = 100.0 + np.arange(30.0)
+        self.manager.supported_assets = ['BTC', 'ETH']
+        self.manager.streamers = {'BTC': self.streamer(prices), 'ETH': self.streamer(prices[:9])}
+
+        self.assertEqual(self.manager._calculate_price_correlations(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+# tests/test_multi_timeframe_analyzer.py - Testes do ring de candles e do cache de análise
+
+import unittest
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock
+
+import numpy as np
+
+# Ajustar path para imports
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.multi_timeframe_analyzer import MultiTimeframeAnalyzer, _CandleRing
+
+
+class TestCandleRing(unittest.TestCase):
+    """Testes do _CandleRing (buffer circular SoA)"""
+
+    def fill(self, ring, count):
+        """Candles com epoch 60*i e close 100+i"""
+        for i in range(count):
+            close = 100.0 + i
+            ring.append(60 * i, close, close + 0.5, close - 0.5, close, 1.0)
+
+    def test_window_before_wraparound(self):
+        """Antes de encher, a janela é uma view em ordem cronológica"""
+        ring = _CandleRing(5)
+        self.fill(ring, 3)
+
+        closes = ring.window(ring.closes)
+        self.assertEqual(len(ring), 3)
+        self.assertEqual(closes.tolist(), [100.0, 101.0, 102.0])
+        self.assertTrue(np.shares_memory(closes, ring.closes))
+        self.assertEqual(ring.last_epoch, 120)
+
+    def test_window_after_wraparound(self):
+        """Depois de dar a volta, só os `capacity` candles mais recentes, em ordem"""
+        ring = _CandleRing(5)
+        self.fill(ring, 8)
+
+        self.assertEqual(len(ring), 5)
+        self.assertEqual(ring.window(ring.closes).tolist(), [103.0, 104.0, 105.0, 106.0, 107.0])
+        self.assertEqual(ring.window(ring.epochs).tolist(), [180, 240, 300, 360, 420])
+        self.assertEqual(ring.last_epoch, 420)
+
+    def test_update_last(self):
+        """update_last ajusta high/low/close, soma volume e conta ticks"""
+        ring = _CandleRing(5)
+        self.fill(ring, 2)
+
+        ring.update_last(103.0, 2.0)
+        ring.update_last(99.0, 0.5)
+        ring.update_last(100.5, 0.25)
+
+        self.assertEqual(ring.last_row(), (60, 101.0, 103.0, 99.0, 100.5, 3.75, 4))
+        # O candle anterior não muda
+        self.assertEqual(ring.window(ring.closes).tolist(), [100.0, 100.5])
+
+    def test_update_last_at_array_end(self):
+        """Com head == 0 o candle mais recente é o último slot do array"""
+        ring = _CandleRing(3)
+        self.fill(ring, 3)
+        self.assertEqual(ring._head, 0)
+
+        ring.update_last(110.0, 1.0)
+
+        self.assertEqual(ring.last_row(), (120, 102.0, 110.0, 101.5, 110.0, 2.0, 2))
+        self.assertEqual(ring.window(ring.closes).tolist(), [100.0, 101.0, 110.0])
+
+    def test_version_bump(self):
+        """Cada append e update_last incrementa a versão"""
+        ring = _CandleRing(2)
+        self.assertEqual(ring.version, 0)
+
+        self.fill(ring, 3)
+        self.assertEqual(ring.version, 3)
+        ring.update_last(102.5, 1.0)
+        self.assertEqual(ring.version, 4)
+
+        ring.window(ring.closes)
+        ring.last_row()
+        self.assertEqual(ring.version, 4)
+
+
+class TestTimeframeAnalysisCache(unittest.TestCase):
+    """A análise por timeframe só é recalculada quando o ring muda"""
+
+    def setUp(self):
+        """Setup para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.analyzer = MultiTimeframeAnalyzer('BTC', os.path.join(self.temp_dir, 'multi_tf.db'))
+        self.strategy = MagicMock()
+        self.strategy.analyze.side_effect = lambda closes, volumes, timeframe: {'last_close': float(closes[-1])}
+        self.analyzer.strategies['scalping'] = self.strategy
+
+    def tearDown(self):
+        """Cleanup após cada teste"""
+        self.analyzer.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_cache_follows_ring_version(self):
+        ring = _CandleRing(10)
+        ring.append(0, 100.0, 100.0, 100.0, 100.0, 1.0)
+
+        first = self.analyzer._get_timeframe_analysis('1m', ring)
+        self.assertIs(self.analyzer._get_timeframe_analysis('1m', ring), first)
+        self.assertEqual(self.strategy.analyze.call_count, 1)
+
+        ring.update_last(101.0, 1.0)
+        self.assertEqual(self.analyzer._get_timeframe_analysis('1m', ring), {'last_close': 101.0})
+        self.assertEqual(self.strategy.analyze.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
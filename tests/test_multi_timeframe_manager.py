@@ -0,0 +1,59 @@
+# tests/test_multi_timeframe_manager.py - Testes da ingestão em lote do MultiTimeframeManager
+
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+# Ajustar path para imports
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.multi_timeframe_manager import MultiTimeframeManager
+
+
+class TestTickBatch(unittest.TestCase):
+    """Testes de add_tick_batch"""
+
+    def setUp(self):
+        """Setup para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manager = MultiTimeframeManager(db_path=os.path.join(self.temp_dir, 'multi_tf.db'))
+
+    def tearDown(self):
+        """Cleanup após cada teste"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_batch_builds_one_candle_per_period(self):
+        """Ticks de três minutos diferentes geram três candles de 1m"""
+        start = datetime(2024, 1, 1, 12, 0, 0)
+        timestamps = [start + timedelta(seconds=30 * i) for i in range(6)]
+        prices = [100.0, 102.0, 101.0, 99.0, 103.0, 104.0]
+
+        self.manager.add_tick_batch('BTC', prices, [1.0] * 6, timestamps)
+
+        candles = self.manager.get_data('BTC', '1m')
+        self.assertEqual([(c['open'], c['high'], c['low'], c['close'], c['volume']) for c in candles], [
+            (100.0, 102.0, 100.0, 102.0, 2.0),
+            (101.0, 101.0, 99.0, 99.0, 2.0),
+            (103.0, 104.0, 103.0, 104.0, 2.0),
+        ])
+
+    def test_timestamps_required(self):
+        with self.assertRaises(TypeError):
+            self.manager.add_tick_batch('BTC', [100.0, 101.0], [1.0, 1.0])
+
+    def test_length_mismatch(self):
+        """Sequências de tamanhos diferentes são rejeitadas em vez de truncadas pelo zip"""
+        timestamps = [datetime(2024, 1, 1), datetime(2024, 1, 1, 0, 1)]
+        with self.assertRaises(ValueError):
+            self.manager.add_tick_batch('BTC', [100.0, 101.0, 102.0], [1.0, 1.0, 1.0], timestamps)
+        with self.assertRaises(ValueError):
+            self.manager.add_tick_batch('BTC', [100.0, 101.0], [1.0], timestamps)
+
+        self.assertEqual(self.manager.get_data('BTC', '1m'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,303 @@
+# tests/test_trading_analyzer.py - Testes dos analyzers de produção e V2
+
+import unittest
+import csv
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+import numpy as np
+
+# Ajustar path para imports
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.trading_analyzer import EnhancedTradingAnalyzer
+from services.enhanced_trading_analyzer_v2 import EnhancedTradingAnalyzerV2
+from services.signal_monitor import SignalMonitor
+from services import _ta_kernels
+from database.setup import setup_trading_analyzer_db
+
+
+class AnalyzerTestCase(unittest.TestCase):
+    """Base: analyzers de produção e V2 com bancos temporários"""
+
+    def setUp(self):
+        """Setup para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.analyzer = EnhancedTradingAnalyzer(db_path=os.path.join(self.temp_dir, 'prod.db'))
+        self.analyzer_v2 = EnhancedTradingAnalyzerV2(db_path=os.path.join(self.temp_dir, 'v2.db'))
+
+    def tearDown(self):
+        """Cleanup após cada teste"""
+        self.analyzer.close()
+        self.analyzer_v2.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def feed(self, prices, volume=1.0):
+        """Alimenta os dois analyzers com a mesma série de preços"""
+        start = datetime(2024, 1, 1)
+        for i, price in enumerate(prices):
+            timestamp = start + timedelta(seconds=i)
+            self.analyzer.add_price_data(timestamp, price, volume)
+            self.analyzer_v2.add_price_data(timestamp, price, volume)
+
+
+class TestTrendDirection(AnalyzerTestCase):
+    """Testes da tabela de tendência (_TREND_TABLE)"""
+
+    CASES = [
+        # (sma_9, sma_21, sma_50, esperado)
+        (3.0, 2.0, 1.0, 'STRONG_BULL'),
+        (3.0, 2.0, 2.0, 'BULL'),
+        (3.0, 2.0, 4.0, 'BULL'),
+        (2.0, 2.0, 1.0, 'NEUTRAL'),
+        (2.0, 2.0, 2.0, 'NEUTRAL'),
+        (2.0, 2.0, 3.0, 'NEUTRAL'),
+        (1.0, 2.0, 1.0, 'BEAR'),
+        (1.0, 2.0, 2.0, 'BEAR'),
+        (1.0, 2.0, 3.0, 'STRONG_BEAR'),
+    ]
+
+    def assert_trends(self, to_value):
+        for analyzer in (self.analyzer, self.analyzer_v2):
+            for sma_9, sma_21, sma_50, expected in self.CASES:
+                indicators = {'sma_9': to_value(sma_9), 'sma_21': to_value(sma_21), 'sma_50': to_value(sma_50)}
+                with self.subTest(analyzer=type(analyzer).__name__, indicators=indicators):
+                    self.assertEqual(analyzer._determine_trend_direction(indicators), expected)
+
+    def test_python_floats(self):
+        """Testa sma_9 >, == e < sma_21 com floats Python"""
+        self.assert_trends(float)
+
+    def test_numpy_floats(self):
+        """Testa os mesmos casos com np.float64 (comparações geram np.bool_)"""
+        self.assert_trends(np.float64)
+
+    def test_indicators_with_short_history(self):
+        """Com menos de 50 preços sma_50 é escalar NumPy; o cálculo não pode falhar"""
+        self.feed(100.0 + np.arange(40) * 0.1)
+
+        for analyzer in (self.analyzer, self.analyzer_v2):
+            with self.subTest(analyzer=type(analyzer).__name__):
+                indicators = analyzer._calculate_comprehensive_indicators()
+                # sma_50 cai para o último preço: sma_9 > sma_21 < sma_50
+                self.assertEqual(indicators.get('trend_direction'), 'BULL')
+
+
+class TestSignalCsvExport(AnalyzerTestCase):
+    """Testes de export_signals_to_csv"""
+
+    def make_signal(self, signal_id, status):
+        return {
+            'id': signal_id, 'timestamp': '2024-01-01T00:00:00', 'pattern_type': 'CONFLUENCE_BUY',
+            'entry_price': 100.5, 'target_price': 103.0, 'stop_loss': 99.0, 'confidence': 72.5,
+            'status': status, 'created_at': '2024-01-01T00:00:00', 'profit_loss': 1.25,
+            'activated': True, 'atr_value': 0.4,  # campos extras não são exportados
+        }
+
+    def test_columns_and_rows(self):
+        """Cria o diretório, escreve o cabeçalho fixo e uma linha por sinal"""
+        self.analyzer.signals = [self.make_signal(1, 'ACTIVE'), self.make_signal(2, 'HIT_TARGET')]
+        filename = os.path.join(self.temp_dir, 'exports', 'signals.csv')
+
+        self.assertEqual(self.analyzer.export_signals_to_csv(filename), filename)
+
+        with open(filename, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ['id', 'timestamp', 'pattern_type', 'entry_price', 'target_price',
+                                   'stop_loss', 'confidence', 'status', 'created_at', 'profit_loss'])
+        self.assertEqual(rows[1:], [
+            ['1', '2024-01-01T00:00:00', 'CONFLUENCE_BUY', '100.5', '103.0', '99.0', '72.5',
+             'ACTIVE', '2024-01-01T00:00:00', '1.25'],
+            ['2', '2024-01-01T00:00:00', 'CONFLUENCE_BUY', '100.5', '103.0', '99.0', '72.5',
+             'HIT_TARGET', '2024-01-01T00:00:00', '1.25'],
+        ])
+
+    def test_empty_export(self):
+        """Sem sinais, o arquivo tem só o cabeçalho"""
+        filename = os.path.join(self.temp_dir, 'empty.csv')
+        self.analyzer.export_signals_to_csv(filename)
+
+        with open(filename, newline='', encoding='utf-8') as f:
+            self.assertEqual(len(list(csv.reader(f))), 1)
+
+
+class TestConcurrentSignalClose(AnalyzerTestCase):
+    """Loop do monitor e force_check_signals fechando o mesmo sinal ao mesmo tempo"""
+
+    def test_signal_closed_once(self):
+        """O sinal é fechado, persistido e contado no win rate uma única vez"""
+        self.analyzer.signals = [{'id': 1, 'pattern_type': 'CONFLUENCE_BUY', 'entry_price': 100.0,
+                                  'target_price': 101.0, 'stop_loss': 99.0, 'status': 'ACTIVE'}]
+        closed_before = self.analyzer._closed_count
+        monitor = SignalMonitor(self.analyzer, self.analyzer.db_path)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def exit_conditions(signal, current_price):
+            barrier.wait()  # as duas verificações já copiaram o sinal como ACTIVE
+            return 'HIT_TARGET'
+
+        with patch.object(monitor, '_get_current_bitcoin_price', return_value=101.5), \
+             patch.object(monitor, '_check_exit_conditions', side_effect=exit_conditions), \
+             patch.object(monitor, '_update_signal_in_db') as update_db:
+            threads = [threading.Thread(target=monitor._check_active_signals) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+
+        self.assertEqual(self.analyzer.signals[0]['status'], 'HIT_TARGET')
+        self.assertEqual(update_db.call_count, 1)
+        self.assertEqual(self.analyzer._closed_count, closed_before + 1)
+
+
+class TestV2MarketAnalysis(AnalyzerTestCase):
+    """Testes da análise completa periódica do analyzer V2"""
+
+    def test_analysis_runs_on_cadence(self):
+        """A análise roda a cada _analysis_every ticks sem levantar erro"""
+        with patch.object(self.analyzer_v2, '_comprehensive_market_analysis',
+                          wraps=self.analyzer_v2._comprehensive_market_analysis) as analysis, \
+             patch('services.enhanced_trading_analyzer_v2.logger') as log:
+            self.feed(100.0 + np.sin(np.arange(60) / 5.0))
+
+        # A partir de 50 preços, a cada 5 ticks: ticks 50, 55 e 60
+        self.assertEqual(analysis.call_count, 3)
+        log.error.assert_not_called()
+
+    def test_analysis_does_not_generate_signals(self):
+        """A análise periódica não gera nem grava sinais tradicionais"""
+        self.analyzer_v2.advanced_analyzer = MagicMock()
+        self.feed(100.0 + np.sin(np.arange(120) / 5.0))
+
+        self.assertEqual(self.analyzer_v2.signals, [])
+        count = self.analyzer_v2._conn.execute("SELECT COUNT(*) FROM trading_signals").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_cached_analysis_returns_copy(self):
+        """O resultado em cache é entregue como cópia: alterar o retorno não corrompe o cache"""
+        self.feed(100.0 + np.sin(np.arange(60) / 5.0))
+        self.analyzer_v2.signals.append({
+            'id': 1, 'pattern_type': 'CONFLUENCE_BUY', 'entry_price': 100.0, 'stop_loss': 99.0,
+            'confidence': 80.0, 'status': 'ACTIVE', 'created_at': '2024-01-01T00:00:00',
+        })
+
+        active = self.analyzer_v2._format_active_signals()
+        self.assertEqual(len(active), 1)
+        active[0]['entry'] = 0.0
+        active.clear()
+
+        again = self.analyzer_v2._format_active_signals()
+        self.assertEqual(len(again), 1)
+        self.assertEqual(again[0]['entry'], 100.0)
+
+
+class TestV2SchemaMigration(AnalyzerTestCase):
+    """Backfill de signal_method aplicado uma única vez por banco (PRAGMA user_version)"""
+
+    def insert_null_method_signal(self, conn):
+        conn.execute("""
+            INSERT INTO trading_signals (timestamp, pattern_type, status, created_at, signal_method)
+            VALUES ('2024-01-01T00:00:00', 'CONFLUENCE_BUY', 'HIT_TARGET', '2024-01-01T00:00:00', NULL)
+        """)
+        conn.commit()
+
+    def methods(self, conn):
+        return [row[0] for row in conn.execute("SELECT signal_method FROM trading_signals ORDER BY id")]
+
+    def test_legacy_database_is_migrated(self):
+        """Banco antigo (coluna sem default, versão 0) tem os métodos nulos normalizados"""
+        db_path = os.path.join(self.temp_dir, 'legacy.db')
+        setup_trading_analyzer_db(db_path)
+        conn = sqlite3.connect(db_path)
+        conn.execute("ALTER TABLE trading_signals ADD COLUMN signal_method TEXT")
+        self.insert_null_method_signal(conn)
+        conn.close()
+
+        analyzer = EnhancedTradingAnalyzerV2(db_path=db_path)
+        try:
+            self.assertEqual(self.methods(analyzer._conn), ['TRADITIONAL'])
+            self.assertEqual(analyzer._conn.execute("PRAGMA user_version").fetchone()[0], 1)
+        finally:
+            analyzer.close()
+
+    def test_backfill_runs_once(self):
+        """Com o banco já migrado, init_database não reexecuta o UPDATE"""
+        conn = self.analyzer_v2._conn
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 1)
+        self.insert_null_method_signal(conn)
+
+        self.analyzer_v2.init_database()
+        self.assertEqual(self.methods(conn), [None])
+
+        conn.execute("PRAGMA user_version = 0")
+        self.analyzer_v2.init_database()
+        self.assertEqual(self.methods(conn), ['TRADITIONAL'])
+        self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], 1)
+
+
+class TestV2IncrementalPeriods(AnalyzerTestCase):
+    """O estado incremental acompanha mudanças de período feitas em tempo de execução"""
+
+    def setUp(self):
+        super().setUp()
+        # Padrões avançados não participam destes testes (e gravam no mesmo banco)
+        self.analyzer_v2.advanced_analyzer = MagicMock()
+        self.prices = 100.0 + np.cumsum(np.random.default_rng(3).normal(0.0, 0.2, 120))
+        self.feed(self.prices[:100])
+
+    def tick(self, index):
+        """Alimenta só o V2 com o preço de índice `index`"""
+        self.analyzer_v2.add_price_data(datetime(2024, 1, 2) + timedelta(seconds=index), self.prices[index], 1.0)
+
+    def window(self, count):
+        return np.ascontiguousarray(self.prices[:count])
+
+    def test_rsi_period_change(self):
+        """RSI após ta_params.update({'rsi_period': ...}) — na leitura e nos ticks seguintes"""
+        v2 = self.analyzer_v2
+        v2.ta_params.update({'rsi_period': 7})
+        self.assertAlmostEqual(v2._calculate_comprehensive_indicators()['rsi'],
+                               _ta_kernels.rsi(self.window(100), 7), places=9)
+
+        v2.ta_params.update({'rsi_period': 9})
+        for index in range(100, 120):
+            self.tick(index)
+            self.assertAlmostEqual(v2._streaming_rsi(), _ta_kernels.rsi(self.window(index + 1), 9), places=9)
+
+
+    def test_bb_period_change(self):
+        """Bollinger Bands após ta_params.update({'bb_period': ...})"""
+        v2 = self.analyzer_v2
+        v2.ta_params.update({'bb_period': 10})
+        indicators = v2._calculate_comprehensive_indicators()
+        expected = _ta_kernels.bbands(self.window(100), 10, 2.0)
+        for key, value in zip(('bb_upper', 'bb_middle', 'bb_lower'), expected):
+            self.assertAlmostEqual(indicators[key], value, places=9)
+
+        v2.ta_params.update({'bb_period': 30})
+        for index in range(100, 120):
+            self.tick(index)
+            for got, value in zip(v2._streaming_bbands(), _ta_kernels.bbands(self.window(index + 1), 30, 2.0)):
+                self.assertAlmostEqual(got, value, places=9)
+
+    def test_stoch_period_change(self):
+        """Stochastic após ta_params.update({'stoch_k': ...}) — janela menor e maior"""
+        v2 = self.analyzer_v2
+        v2.ta_params.update({'stoch_k': 5})
+        indicators = v2._calculate_comprehensive_indicators()
+        self.assertAlmostEqual(indicators['stoch_k'], _ta_kernels.stoch(self.window(100), 5)[0], places=9)
+
+        v2.ta_params.update({'stoch_k': 25})
+        for index in range(100, 120):
+            self.tick(index)
+            self.assertAlmostEqual(v2._streaming_stochastic()[0],
+                                   _ta_kernels.stoch(self.window(index + 1), 25)[0], places=9)
+
+if __name__ == '__main__':
+    unittest.main()